@@ -1,22 +1,114 @@
 #core\audio_clip.py
-from pydub import AudioSegment
+from .audio_source import AudioSource, open_source
 
 class AudioClip:
-    def __init__(self, file_path: str, start_time: float = 0.0, duration: float = None):
+    def __init__(self, file_path: str, start_time: float = 0.0, duration: float = None,
+                 trim_start: float = 0.0, trim_end: float = None, source: AudioSource = None):
+        self.track = None  # set by Track.add_clip
         self.file_path = file_path
         self.source_path = file_path
         self.start_time = start_time
-        self.audio = AudioSegment.from_file(file_path)
-        self.duration = duration if duration else len(self.audio) / 1000.0  # in seconds
-        self.trim_start = 0.0
-        self.trim_end = len(self.audio) / 1000.0
+        # Only the file header is read here; samples stay on disk until mixed
+        # or drawn. Callers that already know the stream info pass the source.
+        self.source = source if source is not None else open_source(file_path)
+        self.trim_start = trim_start or 0.0
+        if trim_end is None:
+            trim_end = self.trim_start + duration if duration else self.source.duration
+        self.trim_end = trim_end
+
+    # Placement and trims report the time they covered before and after a
+    # change to the owning track, so a mix cache can re-render just that.
+    # One call is one edit: the fields change together and observers are
+    # notified once.
+    def _set_placement(self, **fields):
+        track = self.track
+        if track is not None:
+            track.mark_dirty(self.start_time, self.end_time)
+        for name, value in fields.items():
+            setattr(self, name, value)
+        if track is not None:
+            track.mark_dirty(self.start_time, self.end_time)
+            track.clip_changed(self)
+
+    @property
+    def start_time(self):
+        return self._start_time
+
+    @start_time.setter
+    def start_time(self, value):
+        self._set_placement(_start_time=value)
+
+    # Trims are stored as source frames so repeated edits never drift; the
+    # second-based trim_start/trim_end are conversions of them.
+    @property
+    def first_frame(self):
+        return self._first_frame
+
+    @first_frame.setter
+    def first_frame(self, value):
+        self._set_placement(_first_frame=max(0, int(value)))
+
+    @property
+    def last_frame(self):
+        return self._last_frame
+
+    @last_frame.setter
+    def last_frame(self, value):
+        self._set_placement(_last_frame=self._clamp_last(value))
+
+    def _clamp_last(self, frame):
+        return min(max(0, int(frame)), self.source.frame_count)
+
+    def to_frames(self, seconds: float) -> int:
+        return int(round(seconds * self.source.frame_rate))
+
+    @property
+    def trim_start(self):
+        return self.first_frame / float(self.source.frame_rate)
+
+    @trim_start.setter
+    def trim_start(self, value):
+        self.first_frame = self.to_frames(value)
+
+    @property
+    def trim_end(self):
+        return self.last_frame / float(self.source.frame_rate)
+
+    @trim_end.setter
+    def trim_end(self, value):
+        self.last_frame = self.to_frames(value)
+
+    @property
+    def placement(self):
+        return self.start_time, self.trim_start, self.trim_end
+
+    def set_placement(self, start_time: float, trim_start: float, trim_end: float):
+        self._set_placement(_first_frame=max(0, self.to_frames(trim_start)),
+                            _last_frame=self._clamp_last(self.to_frames(trim_end)),
+                            _start_time=start_time)
+
+    @property
+    def frame_count(self):
+        return max(0, self.last_frame - self.first_frame)
+
+    @property
+    def duration(self):
+        return self.frame_count / float(self.source.frame_rate)  # in seconds
+
+    @property
+    def end_time(self):
+        return self.start_time + self.duration
+
+    @property
+    def audio(self):
+        """A new AudioSegment of the trim window; editing never needs this."""
+        return self.source.segment(self.first_frame, self.last_frame)
 
     def trim(self, start: float, end: float):
-        start_ms = int(start * 1000)
-        end_ms = int(end * 1000)
-        self.audio = self.audio[start_ms:end_ms]
-        self.start_time = 0.0
-        self.duration = (end - start)
+        # start/end are relative to the current trim window, as before. Only
+        # the window moves; the source is untouched, so any trim can be undone.
+        offset = self.trim_start
+        self.set_placement(0.0, offset + start, min(offset + end, self.source.duration))
 
     def export(self, output_path: str):
         self.audio.export(output_path, format="wav")
@@ -25,9 +117,12 @@ class AudioClip:
         return {
             "file_path": self.file_path,
             "start_time": self.start_time,
-            "duration": self.duration
+            "duration": self.duration,
+            "trim_start": self.trim_start,
+            "trim_end": self.trim_end
         }
 
     @staticmethod
     def from_dict(data):
-        return AudioClip(data["file_path"], data["start_time"], data["duration"])
+        return AudioClip(data["file_path"], data["start_time"], data["duration"],
+                         data.get("trim_start", 0.0), data.get("trim_end"))
@@ -0,0 +1,276 @@
+#core\audio_source.py
+import os
+import struct
+import weakref
+from collections import namedtuple
+
+import numpy as np
+from pydub import AudioSegment
+
+AudioInfo = namedtuple("AudioInfo", ["frame_rate", "channels", "sample_width", "frame_count"])
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def segment_to_array(segment: AudioSegment) -> np.ndarray:
+    """Return the samples of a segment as float32 frames of shape (frames, channels) in [-1, 1]."""
+    samples = np.array(segment.get_array_of_samples(), dtype=np.float32)
+    samples = samples.reshape((-1, segment.channels))
+    return samples / float(1 << (8 * segment.sample_width - 1))
+
+
+def to_pcm16(frames: np.ndarray) -> np.ndarray:
+    """Float samples as little-endian 16-bit PCM; anything outside [-1, 1] is clipped."""
+    return np.round(np.clip(frames, -1.0, 1.0) * 32767.0).astype("<i2")
+
+
+def array_to_segment(frames: np.ndarray, frame_rate: int) -> AudioSegment:
+    """Convert float32 frames back to a 16-bit AudioSegment."""
+    pcm = to_pcm16(frames)
+    return AudioSegment(
+        pcm.tobytes(),
+        frame_rate=frame_rate,
+        sample_width=2,
+        channels=frames.shape[1],
+    )
+
+
+class AudioSource:
+    """
+    Read-only access to the sample frames of one audio file.
+
+    Sources are cheap to construct; samples are only touched by read(),
+    which returns float32 frames of shape (frames, channels).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._info = None
+        self.peak_pyramid = None  # filled in by core.peaks.get_peak_pyramid
+
+    def _read_info(self) -> AudioInfo:
+        raise NotImplementedError
+
+    @property
+    def info(self) -> AudioInfo:
+        if self._info is None:
+            self._info = self._read_info()
+        return self._info
+
+    @property
+    def frame_rate(self):
+        return self.info.frame_rate
+
+    @property
+    def channels(self):
+        return self.info.channels
+
+    @property
+    def sample_width(self):
+        return self.info.sample_width
+
+    @property
+    def frame_count(self):
+        return self.info.frame_count
+
+    @property
+    def duration(self):
+        return self.frame_count / float(self.frame_rate)
+
+    def clamp(self, first_frame=0, last_frame=None):
+        if last_frame is None:
+            last_frame = self.frame_count
+        first_frame = min(max(0, int(first_frame)), self.frame_count)
+        last_frame = min(max(first_frame, int(last_frame)), self.frame_count)
+        return first_frame, last_frame
+
+    def read(self, first_frame=0, last_frame=None) -> np.ndarray:
+        raise NotImplementedError
+
+    def segment(self, first_frame=0, last_frame=None) -> AudioSegment:
+        return array_to_segment(self.read(first_frame, last_frame), self.frame_rate)
+
+
+SEGMENT_DTYPES = {1: np.int8, 2: np.dtype("<i2"), 4: np.dtype("<i4")}
+
+
+class SegmentSource(AudioSource):
+    """
+    Source backed by an already decoded AudioSegment. The samples are one
+    read-only array over the segment's bytes, shared by every clip cut
+    from it; reads slice views of it instead of copying segments.
+    """
+
+    def __init__(self, segment: AudioSegment, path=None):
+        super().__init__(path)
+        self._segment = segment
+        self._samples = None
+
+    def _read_info(self):
+        seg = self._segment
+        return AudioInfo(seg.frame_rate, seg.channels, seg.sample_width, int(seg.frame_count()))
+
+    def samples(self) -> np.ndarray:
+        if self._samples is None:
+            seg = self._segment
+            dtype = SEGMENT_DTYPES.get(seg.sample_width)
+            if dtype is None:
+                # 24-bit: no native dtype to view the bytes as
+                self._samples = segment_to_array(seg)
+            else:
+                self._samples = np.frombuffer(seg.raw_data, dtype=dtype).reshape((-1, seg.channels))
+            self._samples.flags.writeable = False
+        return self._samples
+
+    def read(self, first_frame=0, last_frame=None):
+        first_frame, last_frame = self.clamp(first_frame, last_frame)
+        raw = self.samples()[first_frame:last_frame]
+        if raw.dtype == np.float32:
+            return raw.copy()
+        return raw.astype(np.float32) / float(1 << (8 * self.sample_width - 1))
+
+
+class DecodedSource(SegmentSource):
+    """Compressed file (MP3 etc.) decoded through pydub on first use."""
+
+    def __init__(self, path):
+        AudioSource.__init__(self, path)
+        self._segment = None
+        self._samples = None
+
+    def _decode(self):
+        if self._segment is None:
+            self._segment = AudioSegment.from_file(self.path)
+        return self._segment
+
+    def _read_info(self):
+        self._decode()
+        return super()._read_info()
+
+    def read(self, first_frame=0, last_frame=None):
+        self._decode()
+        return super().read(first_frame, last_frame)
+
+
+class WavSource(AudioSource):
+    """
+    PCM or float WAV file. Only the header is parsed up front; sample data
+    is memory-mapped on the first read and only the requested frames are
+    converted.
+    """
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._map = None
+        self._info, self.format_tag, self.data_offset = self._parse_header(path)
+
+    @staticmethod
+    def _parse_header(path):
+        file_size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            riff, _, wave = struct.unpack("<4sI4s", f.read(12))
+            if riff != b"RIFF" or wave != b"WAVE":
+                raise ValueError(f"Not a RIFF/WAVE file: {path}")
+
+            fmt = None
+            while True:
+                header = f.read(8)
+                if len(header) < 8:
+                    raise ValueError(f"No data chunk in {path}")
+                chunk_id, chunk_size = struct.unpack("<4sI", header)
+                if chunk_id == b"fmt ":
+                    fmt = f.read(chunk_size)
+                    if chunk_size % 2:
+                        f.seek(1, os.SEEK_CUR)
+                elif chunk_id == b"data":
+                    data_offset = f.tell()
+                    break
+                else:
+                    f.seek(chunk_size + (chunk_size % 2), os.SEEK_CUR)
+
+        if fmt is None:
+            raise ValueError(f"No fmt chunk in {path}")
+
+        format_tag, channels, frame_rate, _, block_align, bits = struct.unpack("<HHIIHH", fmt[:16])
+        if format_tag == WAVE_FORMAT_EXTENSIBLE and len(fmt) >= 26:
+            format_tag = struct.unpack("<H", fmt[24:26])[0]
+        sample_width = bits // 8
+        if format_tag == WAVE_FORMAT_PCM and sample_width not in (1, 2, 3, 4):
+            raise ValueError(f"Unsupported PCM sample width {bits} in {path}")
+        if format_tag == WAVE_FORMAT_IEEE_FLOAT and sample_width != 4:
+            raise ValueError(f"Unsupported float sample width {bits} in {path}")
+        if format_tag not in (WAVE_FORMAT_PCM, WAVE_FORMAT_IEEE_FLOAT):
+            raise ValueError(f"Unsupported WAV format 0x{format_tag:04x} in {path}")
+
+        # Streaming writers may leave the data size as 0 or 0xFFFFFFFF, so
+        # never trust it beyond what is actually on disk.
+        data_size = min(chunk_size, file_size - data_offset)
+        if chunk_size == 0:
+            data_size = file_size - data_offset
+        frame_count = data_size // block_align
+
+        info = AudioInfo(frame_rate, channels, sample_width, frame_count)
+        return info, format_tag, data_offset
+
+    def _frames(self):
+        if self._map is None:
+            width = self.sample_width
+            if self.format_tag == WAVE_FORMAT_IEEE_FLOAT:
+                dtype, shape = np.dtype("<f4"), (self.frame_count, self.channels)
+            elif width == 3:
+                dtype, shape = np.uint8, (self.frame_count, self.channels, 3)
+            else:
+                dtype = {1: np.uint8, 2: np.dtype("<i2"), 4: np.dtype("<i4")}[width]
+                shape = (self.frame_count, self.channels)
+            if self.frame_count == 0:
+                self._map = np.zeros(shape, dtype=dtype)
+            else:
+                self._map = np.memmap(self.path, dtype=dtype, mode="r", offset=self.data_offset, shape=shape)
+        return self._map
+
+    def read(self, first_frame=0, last_frame=None):
+        first_frame, last_frame = self.clamp(first_frame, last_frame)
+        raw = self._frames()[first_frame:last_frame]
+
+        if self.format_tag == WAVE_FORMAT_IEEE_FLOAT:
+            return np.array(raw, dtype=np.float32)
+        if self.sample_width == 1:
+            return (raw.astype(np.float32) - 128.0) / 128.0
+        if self.sample_width == 3:
+            padded = np.zeros(raw.shape[:2] + (4,), dtype=np.uint8)
+            padded[..., 1:] = raw
+            samples = padded.view("<i4")[..., 0] >> 8
+            return samples.astype(np.float32) / float(1 << 23)
+        return raw.astype(np.float32) / float(1 << (8 * self.sample_width - 1))
+
+
+# Sources are shared between every clip that references the same file and
+# dropped once no clip holds them anymore.
+_source_cache = weakref.WeakValueDictionary()
+
+
+def open_source(path, info: AudioInfo = None) -> AudioSource:
+    """
+    Shared source for a file. `info` is stream info already known for this
+    exact file (e.g. from a session store); it saves decoding compressed
+    files just to learn their length.
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    key = (path, stat.st_size, stat.st_mtime_ns)
+
+    source = _source_cache.get(key)
+    if source is None:
+        if path.lower().endswith(".wav"):
+            try:
+                source = WavSource(path)
+            except (ValueError, struct.error) as e:
+                print(f"[INFO] Falling back to decoder for {path}: {e}")
+        if source is None:
+            source = DecodedSource(path)
+        _source_cache[key] = source
+    if info is not None and source._info is None:
+        source._info = AudioInfo(*info)
+    return source
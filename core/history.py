@@ -0,0 +1,129 @@
+#core\history.py
+import time
+from collections import deque
+
+from .audio_clip import AudioClip
+from .track import Track
+
+HISTORY_LIMIT = 1000
+MERGE_WINDOW = 1.0  # seconds within which repeated nudges of one clip become one step
+
+
+class Command:
+    """One undoable edit. Commands hold only the delta, never audio or copies of the model."""
+
+    def do(self):
+        raise NotImplementedError
+
+    def undo(self):
+        raise NotImplementedError
+
+    def merge(self, other) -> bool:
+        """Fold a following command into this one; return True if it was absorbed."""
+        return False
+
+
+class SetPlacement(Command):
+    """Move and/or trim a clip: start_time, trim_start and trim_end before and after."""
+
+    def __init__(self, clip: AudioClip, start_time=None, trim_start=None, trim_end=None):
+        self.clip = clip
+        self.before = clip.placement
+        self.after = (
+            self.before[0] if start_time is None else start_time,
+            self.before[1] if trim_start is None else trim_start,
+            self.before[2] if trim_end is None else trim_end,
+        )
+        self.time = time.monotonic()
+
+    def do(self):
+        self.clip.set_placement(*self.after)
+
+    def undo(self):
+        self.clip.set_placement(*self.before)
+
+    def merge(self, other):
+        if not isinstance(other, SetPlacement) or other.clip is not self.clip:
+            return False
+        if other.time - self.time > MERGE_WINDOW:
+            return False
+        self.after = other.after
+        self.time = other.time
+        return True
+
+
+class AddClip(Command):
+    def __init__(self, track: Track, clip: AudioClip, index=None):
+        self.track = track
+        self.clip = clip
+        self.index = len(track.clips) if index is None else index
+
+    def do(self):
+        self.track.insert_clip(self.index, self.clip)
+
+    def undo(self):
+        self.track.remove_clip(self.clip)
+
+
+class RemoveClip(Command):
+    def __init__(self, track: Track, clip: AudioClip):
+        self.track = track
+        self.clip = clip
+        self.index = track.clips.index(clip)
+
+    def do(self):
+        self.track.remove_clip(self.clip)
+
+    def undo(self):
+        self.track.insert_clip(self.index, self.clip)
+
+
+class History:
+    """
+    Undo/redo stacks of commands. Every step is a constant-size delta, so
+    undo and redo are O(1) in the size of the session, and at most `limit`
+    steps are kept (the oldest are dropped).
+    """
+
+    def __init__(self, limit=HISTORY_LIMIT):
+        self.undo_stack = deque(maxlen=limit)
+        self.redo_stack = []
+        self._sealed = False  # no merging into a step we just undid or redid
+
+    @property
+    def can_undo(self):
+        return bool(self.undo_stack)
+
+    @property
+    def can_redo(self):
+        return bool(self.redo_stack)
+
+    def execute(self, command: Command):
+        command.do()
+        self.redo_stack.clear()
+        if not self._sealed and self.undo_stack and self.undo_stack[-1].merge(command):
+            return
+        self.undo_stack.append(command)
+        self._sealed = False
+
+    def undo(self):
+        if not self.undo_stack:
+            return None
+        command = self.undo_stack.pop()
+        command.undo()
+        self.redo_stack.append(command)
+        self._sealed = True
+        return command
+
+    def redo(self):
+        if not self.redo_stack:
+            return None
+        command = self.redo_stack.pop()
+        command.do()
+        self.undo_stack.append(command)
+        self._sealed = True
+        return command
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
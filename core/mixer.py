@@ -0,0 +1,269 @@
+#core\mixer.py
+import numpy as np
+from pydub import AudioSegment
+
+from .audio_source import AudioSource, SegmentSource, array_to_segment
+
+# Look-ahead limiter: gain reduction ramps in over LIMITER_WINDOW frames
+# before an overload and out after it. Each output frame depends only on
+# the unlimited mix within LIMITER_MARGIN frames of it, so any block split
+# of a render gives the same audio, and audio further than that from an
+# overload passes through untouched. A power of two keeps unity gain exact.
+LIMITER_WINDOW = 256
+LIMITER_MARGIN = LIMITER_WINDOW + LIMITER_WINDOW // 2
+GAIN_STEP = 1.0 / (1 << 16)  # gains are floored to this grid so their sums are exact
+
+
+def conform_channels(frames: np.ndarray, channels: int) -> np.ndarray:
+    if frames.shape[1] == channels:
+        return frames
+    if channels == 1:
+        return frames.mean(axis=1, keepdims=True)
+    if frames.shape[1] == 1:
+        return np.repeat(frames, channels, axis=1)
+    out = np.zeros((frames.shape[0], channels), dtype=np.float32)
+    n = min(channels, frames.shape[1])
+    out[:, :n] = frames[:, :n]
+    return out
+
+
+def read_resampled(source: AudioSource, first_frame: int, last_frame: int,
+                   offset: int, count: int, frame_rate: int) -> np.ndarray:
+    """
+    Read `count` frames at `frame_rate`, starting `offset` output frames into
+    the source window [first_frame, last_frame). Rate mismatches are handled
+    with linear interpolation, which is good enough between clips.
+    """
+    if source.frame_rate == frame_rate:
+        start = first_frame + offset
+        return source.read(start, min(start + count, last_frame))
+
+    ratio = source.frame_rate / float(frame_rate)
+    positions = (offset + np.arange(count, dtype=np.float64)) * ratio
+    lo = int(positions[0])
+    hi = min(int(np.ceil(positions[-1])) + 1, last_frame - first_frame)
+    frames = source.read(first_frame + lo, first_frame + hi)
+    out = np.empty((count, frames.shape[1]), dtype=np.float32)
+    src_index = np.arange(len(frames), dtype=np.float64)
+    for ch in range(frames.shape[1]):
+        out[:, ch] = np.interp(positions - lo, src_index, frames[:, ch])
+    return out
+
+
+def _sliding_min(values: np.ndarray, size: int) -> np.ndarray:
+    """min of values[i:i + size] for every full window, in O(n) (van Herk/Gil-Werman)."""
+    count = len(values) - size + 1
+    blocks = -(-len(values) // size)
+    padded = np.full(blocks * size, np.inf)
+    padded[:len(values)] = values
+    grid = padded.reshape(blocks, size)
+    prefix = np.minimum.accumulate(grid, axis=1).ravel()
+    suffix = np.minimum.accumulate(grid[:, ::-1], axis=1)[:, ::-1].ravel()
+    return np.minimum(suffix[:count], prefix[size - 1:size - 1 + count])
+
+
+def apply_limiter(frames: np.ndarray) -> np.ndarray:
+    """
+    Limit to [-1, 1]. `frames` holds the unlimited mix with LIMITER_MARGIN
+    extra frames on each side of the ones wanted; returns the inner frames.
+    The gain of a frame is the mean, over LIMITER_WINDOW neighbouring
+    frames, of the lowest gain any frame within LIMITER_WINDOW of those
+    needs, so it never lets a sample through above full scale.
+    """
+    inner = frames[LIMITER_MARGIN:len(frames) - LIMITER_MARGIN]
+    if not len(inner):
+        return inner
+    peak = np.abs(frames).max(axis=1).astype(np.float64)
+    if peak.max() <= 1.0:
+        return inner
+
+    gain = np.minimum(1.0, 1.0 / np.maximum(peak, 1.0))
+    held = _sliding_min(gain, 2 * LIMITER_WINDOW + 1)  # held[j] belongs to frame j + LIMITER_WINDOW
+    held = np.floor(held / GAIN_STEP) * GAIN_STEP
+    sums = np.concatenate([[0.0], np.cumsum(held)])  # exact: every term is on the GAIN_STEP grid
+    smooth = (sums[LIMITER_WINDOW:] - sums[:-LIMITER_WINDOW]) / LIMITER_WINDOW
+    out = inner * smooth[:len(inner), None].astype(np.float32)
+    return np.clip(out, -1.0, 1.0, out=out)
+
+
+class Mixer:
+    """
+    Sums clips into a single preallocated float32 buffer.
+
+    The output format defaults to the highest sample rate and channel count
+    among the added clips, which is what chained AudioSegment.overlay calls
+    used to produce. `conform(source, frame_rate, channels)` may return a
+    stand-in source already in the output format (see
+    storage.conform_cache), which the mixer then reads instead of
+    resampling or decoding on every mix.
+    """
+
+    def __init__(self, frame_rate: int = None, channels: int = None, conform=None):
+        self.frame_rate = frame_rate
+        self.channels = channels
+        self.conform = conform
+        self.clips = []  # (AudioSource, start_time in seconds, first_frame, last_frame)
+
+    def add_source(self, source: AudioSource, start_time: float, first_frame: int = 0, last_frame: int = None):
+        first_frame, last_frame = source.clamp(first_frame, last_frame)
+        self.clips.append((source, start_time, first_frame, last_frame))
+
+    def add_segment(self, segment: AudioSegment, start_time: float):
+        self.add_source(SegmentSource(segment), start_time)
+
+    def output_format(self):
+        frame_rate = self.frame_rate or max((clip[0].frame_rate for clip in self.clips), default=44100)
+        channels = self.channels or max((clip[0].channels for clip in self.clips), default=2)
+        return frame_rate, channels
+
+    def prepare(self):
+        """Resolve clip placements in output frames. Called again whenever clips are added."""
+        frame_rate, channels = self.output_format()
+        self._placed = []
+        self._frame_count = 0
+        for source, start_time, first_frame, last_frame in self.clips:
+            length = int(round((last_frame - first_frame) * frame_rate / float(source.frame_rate)))
+            start_frame = max(0, int(round(start_time * frame_rate)))
+            if self.conform is not None and length > 0:
+                source, first_frame, last_frame = self._conformed(
+                    source, first_frame, last_frame, length, frame_rate, channels)
+            if length > 0:
+                self._placed.append((start_frame, length, source, first_frame, last_frame))
+            self._frame_count = max(self._frame_count, start_frame + length)
+        self._prepared_for = len(self.clips)
+
+    def _conformed(self, source, first_frame, last_frame, length, frame_rate, channels):
+        conformed = self.conform(source, frame_rate, channels)
+        if conformed is None or conformed is source:
+            return source, first_frame, last_frame
+        # The stand-in is at the output rate: map the trim window onto it
+        first = int(round(first_frame * frame_rate / float(source.frame_rate)))
+        return conformed, first, min(first + length, conformed.frame_count)
+
+    def _ensure_prepared(self):
+        if getattr(self, "_prepared_for", None) != len(self.clips):
+            self.prepare()
+
+    @property
+    def frame_count(self):
+        self._ensure_prepared()
+        return self._frame_count
+
+    def render(self, start_frame: int, frame_count: int, limit: bool = True) -> np.ndarray:
+        """
+        Mix and limit the output frames [start_frame, start_frame + frame_count).
+        Rendering a block only reads the parts of clips that overlap it, so
+        playback and export can stream the mix instead of building it whole.
+        """
+        self._ensure_prepared()
+        if limit:
+            # The limiter needs the mix around the block as well
+            padded = self.render(start_frame - LIMITER_MARGIN, frame_count + 2 * LIMITER_MARGIN, limit=False)
+            return apply_limiter(padded)
+
+        frame_rate, channels = self.output_format()
+        end_frame = start_frame + frame_count
+
+        bus = np.zeros((frame_count, channels), dtype=np.float32)
+        for clip_start, length, source, first_frame, last_frame in self._placed:
+            a = max(start_frame, clip_start)
+            b = min(end_frame, clip_start + length)
+            if a >= b:
+                continue
+            frames = read_resampled(source, first_frame, last_frame, a - clip_start, b - a, frame_rate)
+            frames = conform_channels(frames, channels)
+            bus[a - start_frame:a - start_frame + len(frames)] += frames
+
+        return bus
+
+    def mix(self) -> np.ndarray:
+        return self.render(0, self.frame_count)
+
+    def mixdown(self) -> AudioSegment:
+        frame_rate, _ = self.output_format()
+        return array_to_segment(self.mix(), frame_rate)
+
+
+def timeline_mixer(timeline, frame_rate: int = None, channels: int = None, conform=None) -> Mixer:
+    mixer = Mixer(frame_rate, channels, conform)
+    for track in timeline.tracks:
+        for clip in track.clips:
+            mixer.add_source(clip.source, clip.start_time, clip.first_frame, clip.last_frame)
+    return mixer
+
+
+def _merge_ranges(ranges):
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+class MixCache:
+    """
+    Keeps the unlimited master bus of a timeline between mixes and only
+    re-renders the time ranges its tracks marked dirty, so re-mixing after
+    an edit costs in proportion to the edit rather than the session.
+
+    Only the summed bus is cached: a buffer per track would hold
+    tracks x session length of float32 audio. Dirty ranges are rebuilt
+    from the clips overlapping them on every track, which is the same
+    order of work.
+    """
+
+    def __init__(self, timeline, conform=None):
+        self.timeline = timeline
+        self.conform = conform
+        self.bus = None
+        self.format = None
+        self.frame_count = 0
+        self._tracks = ()
+
+    def update(self):
+        mixer = timeline_mixer(self.timeline, conform=self.conform)
+        fmt = mixer.output_format()
+        tracks = tuple(id(track) for track in self.timeline.tracks)
+        dirty = [r for track in self.timeline.tracks for r in track.take_dirty()]
+        frame_count = mixer.frame_count
+
+        if self.bus is None or fmt != self.format or tracks != self._tracks:
+            self.bus = mixer.render(0, frame_count, limit=False)
+            self.format, self._tracks, self.frame_count = fmt, tracks, frame_count
+            return
+
+        if frame_count > len(self.bus):
+            grown = np.zeros((max(frame_count, len(self.bus) * 5 // 4), fmt[1]), dtype=np.float32)
+            grown[:len(self.bus)] = self.bus
+            self.bus = grown
+
+        frame_rate = fmt[0]
+        frame_ranges = [(int(start * frame_rate), int(np.ceil(end * frame_rate)) + 1) for start, end in dirty]
+        for start, end in _merge_ranges(frame_ranges):
+            start, end = max(0, start), min(end, len(self.bus))
+            if start < end:
+                self.bus[start:end] = mixer.render(start, end - start, limit=False)
+        self.frame_count = frame_count
+
+    # Block source interface shared with Mixer, so playback can read from the cache
+    def output_format(self):
+        return self.format
+
+    def render(self, start_frame: int, frame_count: int) -> np.ndarray:
+        end_frame = min(start_frame + frame_count, self.frame_count)
+        if end_frame <= start_frame:
+            return np.zeros((0, self.format[1]), dtype=np.float32)
+        # Past either end of the session the mix is silence
+        lo, hi = start_frame - LIMITER_MARGIN, end_frame + LIMITER_MARGIN
+        padded = np.zeros((hi - lo, self.format[1]), dtype=np.float32)
+        a, b = max(lo, 0), min(hi, self.frame_count)
+        padded[a - lo:b - lo] = self.bus[a:b]
+        return apply_limiter(padded)
+
+    def mix(self) -> np.ndarray:
+        return self.render(0, self.frame_count)
+
+    def mixdown(self) -> AudioSegment:
+        return array_to_segment(self.mix(), self.format[0])
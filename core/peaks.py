@@ -0,0 +1,85 @@
+#core\peaks.py
+import numpy as np
+
+from .audio_source import AudioSource
+
+BASE_BLOCK = 256          # frames summarised by one entry of level 0
+BUILD_CHUNK = BASE_BLOCK * 1024
+
+
+def _pairwise(values: np.ndarray, reduce) -> np.ndarray:
+    if len(values) % 2:
+        values = np.append(values, values[-1])
+    return reduce(values[0::2], values[1::2])
+
+
+class PeakPyramid:
+    """
+    Min/max waveform summary of a whole source at power-of-two block sizes.
+
+    Level k stores one (min, max) pair per BASE_BLOCK * 2**k frames, mixed
+    down to mono by taking the extremes across channels. Any frame window
+    can then be drawn at any width by reducing at most a couple of entries
+    per pixel column instead of touching the raw samples.
+    """
+
+    def __init__(self, source: AudioSource, mins=None, maxs=None):
+        self.source = source
+        if mins is None:
+            mins, maxs = self._scan(source)
+        self.levels = [(mins, maxs)]
+        while len(mins) > 1:
+            mins = _pairwise(mins, np.minimum)
+            maxs = _pairwise(maxs, np.maximum)
+            self.levels.append((mins, maxs))
+        top_min, top_max = self.levels[-1]
+        self.peak = float(max(-top_min.min(), top_max.max())) if len(top_min) else 0.0
+
+    @staticmethod
+    def _scan(source: AudioSource):
+        mins, maxs = [], []
+        for first in range(0, source.frame_count, BUILD_CHUNK):
+            frames = source.read(first, first + BUILD_CHUNK)
+            starts = np.arange(0, len(frames), BASE_BLOCK)
+            mins.append(np.minimum.reduceat(frames.min(axis=1), starts))
+            maxs.append(np.maximum.reduceat(frames.max(axis=1), starts))
+        if not mins:
+            return np.zeros(0, np.float32), np.zeros(0, np.float32)
+        return (np.concatenate(mins).astype(np.float32),
+                np.concatenate(maxs).astype(np.float32))
+
+    def peaks(self, first_frame: int, last_frame: int, columns: int):
+        """Return (mins, maxs) arrays with one entry per pixel column for the frame window."""
+        first_frame, last_frame = self.source.clamp(first_frame, last_frame)
+        columns = int(columns)
+        if columns <= 0 or last_frame <= first_frame:
+            return np.zeros(0, np.float32), np.zeros(0, np.float32)
+
+        frames_per_column = (last_frame - first_frame) / float(columns)
+        edges = first_frame + np.arange(columns + 1) * frames_per_column
+
+        if frames_per_column < BASE_BLOCK:
+            # Zoomed in past level 0: the window is at most BASE_BLOCK frames per
+            # column, so reading it directly is still proportional to the width.
+            frames = self.source.read(first_frame, last_frame)
+            lo, hi = frames.min(axis=1), frames.max(axis=1)
+            block, base = 1, first_frame
+        else:
+            level = min(int(np.log2(frames_per_column / BASE_BLOCK)), len(self.levels) - 1)
+            lo, hi = self.levels[level]
+            block, base = BASE_BLOCK << level, 0
+
+        stop = min(len(lo), int(np.ceil((last_frame - base) / float(block))))
+        lo, hi = lo[:stop], hi[:stop]
+        starts = np.floor((edges[:-1] - base) / block).astype(np.int64)
+        starts = np.clip(starts, 0, stop - 1)
+        # reduceat needs non-decreasing indices; equal neighbours just repeat an entry
+        starts = np.maximum.accumulate(starts)
+        return np.minimum.reduceat(lo, starts), np.maximum.reduceat(hi, starts)
+
+
+def get_peak_pyramid(source: AudioSource) -> PeakPyramid:
+    """Build the pyramid for a source once and share it between every clip using it."""
+    if source.peak_pyramid is None:
+        source.peak_pyramid = PeakPyramid(source)
+    return source.peak_pyramid
@@ -0,0 +1,215 @@
+#core\playback.py
+import threading
+import time
+import wave
+
+import numpy as np
+
+from .audio_source import to_pcm16
+
+BLOCK_FRAMES = 2048
+
+
+class NullSink:
+    """
+    Discards audio. With realtime=True it still paces writes to the frame
+    rate, so the engine behaves like it would against a device.
+    """
+
+    def __init__(self, realtime=False):
+        self.realtime = realtime
+        self.frames_written = 0
+
+    def open(self, frame_rate, channels):
+        self.frame_rate = frame_rate
+        self.frames_written = 0
+        self._started = time.monotonic()
+
+    def write(self, frames: np.ndarray):
+        self.frames_written += len(frames)
+        if self.realtime:
+            ahead = self.frames_written / float(self.frame_rate) - (time.monotonic() - self._started)
+            if ahead > 0:
+                time.sleep(ahead)
+
+    def frames_played(self):
+        if not self.realtime:
+            return self.frames_written
+        elapsed = int((time.monotonic() - self._started) * self.frame_rate)
+        return min(elapsed, self.frames_written)
+
+    def drain(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class WavFileSink(NullSink):
+    """Writes the played blocks to a 16-bit WAV file."""
+
+    def __init__(self, path):
+        super().__init__(realtime=False)
+        self.path = path
+        self._wav = None
+
+    def open(self, frame_rate, channels):
+        super().open(frame_rate, channels)
+        self._wav = wave.open(self.path, "wb")
+        self._wav.setnchannels(channels)
+        self._wav.setsampwidth(2)
+        self._wav.setframerate(frame_rate)
+
+    def write(self, frames):
+        self._wav.writeframes(to_pcm16(frames).tobytes())
+        super().write(frames)
+
+    def close(self):
+        if self._wav is not None:
+            self._wav.close()
+            self._wav = None
+
+
+class PygameSink:
+    """
+    Streams blocks to pygame.mixer by queueing one Sound behind the one
+    that is playing. Position is counted from finished blocks plus the
+    time spent in the current one.
+    """
+
+    def __init__(self, buffer_size=1024):
+        self.buffer_size = buffer_size
+        self.channel = None
+
+    def open(self, frame_rate, channels):
+        import pygame
+
+        wanted = (frame_rate, -16, channels)
+        if pygame.mixer.get_init() != wanted:
+            if pygame.mixer.get_init():
+                pygame.mixer.quit()
+            # allowedchanges=0: SDL converts to the device format itself.
+            # Sounds are built from our raw PCM and the position is counted
+            # at frame_rate, so the mixer must run at exactly that format.
+            pygame.mixer.init(frequency=frame_rate, size=-16, channels=channels, buffer=self.buffer_size,
+                              allowedchanges=0)
+        self.pygame = pygame
+        self.frame_rate = frame_rate
+        self.channel = pygame.mixer.Channel(0)
+        self._closed = False
+        self._lock = threading.Lock()
+        self._lengths = []          # frames of the playing block and the queued one
+        self._frames_done = 0
+        self._block_started = None
+
+    def _retire_finished(self):
+        # Called with the lock held: a block finished once the channel has
+        # moved on to the queued one or stopped altogether.
+        busy = self.channel.get_busy()
+        queued = self.channel.get_queue() is not None
+        pending = (1 if busy else 0) + (1 if queued else 0)
+        while len(self._lengths) > pending:
+            self._frames_done += self._lengths.pop(0)
+            self._block_started = time.monotonic() if busy else None
+
+    def write(self, frames):
+        sound = self.pygame.mixer.Sound(buffer=to_pcm16(frames).tobytes())
+        while not self._closed:
+            with self._lock:
+                self._retire_finished()
+                if not self.channel.get_busy():
+                    self.channel.play(sound)
+                    self._lengths.append(len(frames))
+                    self._block_started = time.monotonic()
+                    return
+                if self.channel.get_queue() is None:
+                    self.channel.queue(sound)
+                    self._lengths.append(len(frames))
+                    return
+            time.sleep(0.002)
+
+    def frames_played(self):
+        with self._lock:
+            self._retire_finished()
+            played = self._frames_done
+            if self._lengths and self._block_started is not None:
+                into_block = int((time.monotonic() - self._block_started) * self.frame_rate)
+                played += min(into_block, self._lengths[0])
+            return played
+
+    def drain(self):
+        while not self._closed and self.channel.get_busy():
+            time.sleep(0.005)
+
+    def close(self):
+        self._closed = True
+        if self.channel is not None:
+            self.channel.stop()
+
+
+class PlaybackEngine:
+    """
+    Pulls mixed blocks from a block source (anything with output_format(),
+    frame_count and render(start_frame, frame_count), e.g. a
+    core.mixer.Mixer) on a background thread and feeds them to a sink.
+    The sink is swappable so the engine runs headless with NullSink or
+    WavFileSink.
+    """
+
+    def __init__(self, sink=None, block_frames=BLOCK_FRAMES):
+        self.sink = sink if sink is not None else PygameSink()
+        self.block_frames = block_frames
+        self.start_frame = 0
+        self.frame_rate = None
+        self._thread = None
+        self._stop = threading.Event()
+        self.on_finished = None
+
+    @property
+    def playing(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def position_frames(self):
+        if self.frame_rate is None:
+            return 0
+        return self.start_frame + self.sink.frames_played()
+
+    @property
+    def position_seconds(self):
+        if self.frame_rate is None:
+            return 0.0
+        return self.position_frames / float(self.frame_rate)
+
+    def start(self, source, start_frame=0):
+        self.stop()
+        frame_rate, channels = source.output_format()
+        self.frame_rate = frame_rate
+        self.start_frame = min(max(0, int(start_frame)), source.frame_count)
+        self.sink.open(frame_rate, channels)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(source,), daemon=True)
+        self._thread.start()
+
+    def _run(self, source):
+        position = self.start_frame
+        try:
+            while not self._stop.is_set() and position < source.frame_count:
+                count = min(self.block_frames, source.frame_count - position)
+                self.sink.write(source.render(position, count))
+                position += count
+            if not self._stop.is_set():
+                self.sink.drain()
+                self.sink.close()
+        except Exception as e:
+            print(f"[ERROR] Playback failed: {e}")
+        finally:
+            if not self._stop.is_set() and self.on_finished:
+                self.on_finished()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self.sink.close()
+            self._thread.join()
+            self._thread = None
@@ -2,12 +2,54 @@
 from typing import List
 from .audio_clip import AudioClip
 
+MAX_DIRTY_RANGES = 64
+
 class Track:
     def __init__(self):
         self.clips: List[AudioClip] = []
+        # (start, end) in seconds that changed since a mix cache last rendered this track
+        self.dirty_ranges = []
+        # Bumped on every edit, so views can tell when indexes over the clips are stale
+        self.revision = 0
+        # Called as observer(track, op, clip, index) after every edit; op is
+        # "add", "remove" or "place" (see storage.journal)
+        self.observer = None
 
     def add_clip(self, clip: AudioClip):
-        self.clips.append(clip)
+        self.insert_clip(len(self.clips), clip)
+
+    def insert_clip(self, index: int, clip: AudioClip):
+        self.clips.insert(index, clip)
+        clip.track = self
+        self.mark_dirty(clip.start_time, clip.end_time)
+        self.notify("add", clip, index)
+
+    def remove_clip(self, clip: AudioClip):
+        index = self.clips.index(clip)
+        del self.clips[index]
+        clip.track = None
+        self.mark_dirty(clip.start_time, clip.end_time)
+        self.notify("remove", clip, index)
+
+    def clip_changed(self, clip: AudioClip):
+        if self.observer is not None:
+            self.notify("place", clip, self.clips.index(clip))
+
+    def notify(self, op, clip, index):
+        if self.observer is not None:
+            self.observer(self, op, clip, index)
+
+    def mark_dirty(self, start: float, end: float):
+        self.revision += 1
+        self.dirty_ranges.append((start, end))
+        if len(self.dirty_ranges) > MAX_DIRTY_RANGES:
+            # Nobody is consuming the ranges; keep one that covers them all
+            self.dirty_ranges = [(min(r[0] for r in self.dirty_ranges),
+                                  max(r[1] for r in self.dirty_ranges))]
+
+    def take_dirty(self):
+        ranges, self.dirty_ranges = self.dirty_ranges, []
+        return ranges
 
     def to_dict(self):
         return {"clips": [clip.to_dict() for clip in self.clips]}
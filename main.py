@@ -2,6 +2,7 @@
 import sys
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QFileDialog, QListWidget, QListWidgetItem,
@@ -13,8 +14,15 @@ from core.timeline import Timeline
 from core.track import Track
 from ui.timeline_view import TimelineWidget
 from ui.project_sync import ProjectSyncManager
+from ui.async_loader import when_done
+from core.mixer import timeline_mixer
 from pydub import AudioSegment
-from storage.session_io import load_session_from_file, save_session_to_file
+from storage.session_store import SessionStore, has_session, load_speaker_session
+from storage.journal import discard_journal, replay_journal
+from storage.conform_cache import conformed_source
+from storage.export import export_all_speakers, write_wav_stream
+from storage.sync_watcher import ExportRequestService
+from storage.render_manifest import is_compiled_current, timeline_fingerprint, write_manifest
 
 # === Save last-used path to this file ===
 def get_last_sync_path_file():
@@ -51,6 +59,10 @@ class MainWindow(QMainWindow):
         self.resize(1200, 800)
 
         self.sync_manager = ProjectSyncManager()
+        self.background = ThreadPoolExecutor(max_workers=1)
+        self.loader = ThreadPoolExecutor(max_workers=2)
+        self.pending_loads = {}  # speaker name -> Future of its Timeline
+        self.request_service = None
 
         # === Speaker Sidebar ===
         self.speaker_list = QListWidget()
@@ -77,8 +89,13 @@ class MainWindow(QMainWindow):
         btn_reload = QPushButton("Reload Speakers")
         btn_reload.clicked.connect(self.reload_speakers)
 
+        self.btn_export_all = QPushButton("Export All Speakers")
+        self.btn_export_all.clicked.connect(self.export_all_speakers)
+        self.export_future = None
+
         topbar_layout.addWidget(btn_pick_folder)
         topbar_layout.addWidget(btn_reload)
+        topbar_layout.addWidget(self.btn_export_all)
         topbar_layout.addStretch()
         topbar_layout.addWidget(self.sync_label)
 
@@ -103,6 +120,7 @@ class MainWindow(QMainWindow):
                     self.sync_manager.set_sync_folder(last_path)
                     self.sync_label.setText(f"Sync Folder: {os.path.basename(last_path)}")
                     self.reload_speakers()
+                    self.start_request_service()
         except Exception as e:
             print(f"[INFO] No previous sync folder found: {e}")
 
@@ -112,9 +130,30 @@ class MainWindow(QMainWindow):
             self.sync_manager.set_sync_folder(folder)
             self.sync_label.setText(f"Sync Folder: {os.path.basename(folder)}")
             self.reload_speakers()
+            self.start_request_service()
             with open(get_last_sync_path_file(), "w") as f:
                 f.write(folder)
 
+    def start_request_service(self):
+        """Watch the sync folder and export speakers as soon as Blender requests it."""
+        if self.request_service:
+            self.request_service.stop()
+        self.request_service = ExportRequestService(self.sync_manager.sync_path)
+        self.request_service.start()
+
+    def notify_compiled(self, speaker_path):
+        """Push a compiled_ready notification to Blender if it is connected."""
+        if self.request_service:
+            self.request_service.notify_compiled(speaker_path)
+
+    def closeEvent(self, event):
+        if self.request_service:
+            self.request_service.stop()
+        for twidget in self.timeline_widgets.values():
+            if twidget.journal:
+                twidget.journal.close()
+        super().closeEvent(event)
+
     def reload_speakers(self):
         """Reload speaker data while preserving existing timelines."""
         # Capture previously selected speaker and timeline widgets
@@ -174,44 +213,162 @@ class MainWindow(QMainWindow):
             f"Loaded {len(self.sync_manager.speakers)} speakers.", 3000
         )
 
+    def export_all_speakers(self):
+        """Re-export compiled.wav for every speaker in a process pool, off the GUI thread."""
+        if not self.sync_manager.sync_path:
+            self.statusBar().showMessage("No sync folder selected.", 5000)
+            return
+        if self.export_future is not None:
+            return
+
+        self.btn_export_all.setEnabled(False)
+        self.statusBar().showMessage("Exporting all speakers...")
+        self.export_future = self.background.submit(export_all_speakers, self.sync_manager.sync_path)
+
+        def finished(future):
+            try:
+                results = future.result()
+                failed = sum(1 for r in results if r["error"])
+                self.statusBar().showMessage(f"Exported {len(results) - failed} speakers, {failed} failed.", 5000)
+            except Exception as e:
+                self.statusBar().showMessage(f"Export failed: {e}", 5000)
+            self.export_future = None
+            self.btn_export_all.setEnabled(True)
+            self.sync_manager.reload_speakers()
+            speaker = self.speaker_list.currentItem()
+            if speaker:
+                self.audio_status_widget.update_status(self.sync_manager.speakers.get(speaker.data(1)))
+
+        when_done(self.export_future, finished, interval=200)
+
     def load_timeline_for_speaker(self, item):
         speaker_name = item.data(1)
         speaker_data = self.sync_manager.speakers.get(speaker_name)
-        session_path = os.path.join(speaker_data["path"], "session.json")
 
-        if speaker_name not in self.timeline_widgets:
-            if os.path.exists(session_path):
-                timeline = load_session_from_file(session_path)
-            else:
-                timeline = Timeline(speaker_name)
-                for _ in range(8):
-                    timeline.add_track(Track())
+        if speaker_name in self.timeline_widgets:
+            self.show_speaker_widget(self.timeline_widgets[speaker_name], speaker_data)
+            return
 
-            twidget = TimelineWidget(timeline, sync_path=speaker_data["path"])
-            self.timeline_widgets[speaker_name] = twidget
+        # Sessions are opened on a worker thread; the GUI shows a placeholder
+        # until the timeline arrives, and clips fill in their waveforms later.
+        if speaker_name not in self.pending_loads:
+            future = self.loader.submit(open_speaker_timeline, speaker_data["path"], speaker_name)
+            self.pending_loads[speaker_name] = future
+            when_done(future, lambda f, name=speaker_name: self.on_timeline_loaded(name, f))
+
+        self.show_speaker_widget(self.loading_placeholder(speaker_name), speaker_data)
+
+    def loading_placeholder(self, speaker_name):
+        placeholder = QWidget()
+        layout = QHBoxLayout()
+        layout.addWidget(QLabel(f"Loading {speaker_name}..."))
+        btn_cancel = QPushButton("Cancel")
+        btn_cancel.clicked.connect(lambda: self.cancel_loading(speaker_name))
+        layout.addWidget(btn_cancel)
+        layout.addStretch()
+        placeholder.setLayout(layout)
+        return placeholder
+
+    def cancel_loading(self, speaker_name):
+        future = self.pending_loads.pop(speaker_name, None)
+        if future:
+            future.cancel()
+        self.clear_timeline_layout()
+        self.statusBar().showMessage(f"Cancelled loading {speaker_name}.", 3000)
+
+    def on_timeline_loaded(self, speaker_name, future):
+        if self.pending_loads.get(speaker_name) is not future:
+            return  # cancelled meanwhile
+        del self.pending_loads[speaker_name]
 
-            def export_to_compiled():
-                twidget.mix_project_audio()
-                final = twidget.final_audio
-                if final:
-                    final.export(os.path.join(twidget.sync_path, "compiled.wav"), format="wav")
-                    save_session_to_file(twidget.project_timeline, twidget.sync_path)
+        try:
+            timeline, recovered = future.result()
+        except Exception as e:
+            self.statusBar().showMessage(f"Failed to load {speaker_name}: {e}", 5000)
+            self.clear_timeline_layout()
+            return
+
+        speaker_data = self.sync_manager.speakers.get(speaker_name)
+        if speaker_data is None:
+            return
+        twidget = TimelineWidget(timeline, sync_path=speaker_data["path"])
+        twidget.on_compiled = self.notify_compiled
+        self.timeline_widgets[speaker_name] = twidget
+        if recovered:
+            self.statusBar().showMessage(f"Recovered {recovered} unsaved edits for {speaker_name}.", 5000)
+        self.export_in_background(twidget)
+
+        current = self.speaker_list.currentItem()
+        if current and current.data(1) == speaker_name:
+            self.show_speaker_widget(twidget, speaker_data)
+
+    def export_in_background(self, twidget):
+        """Mix and write compiled.wav off the GUI thread from a snapshot of the timeline."""
+        # Nothing changed since the last render: leave compiled.wav and the
+        # saved session alone so Blender doesn't see a new mtime.
+        fingerprint = timeline_fingerprint(twidget.project_timeline)
+        if is_compiled_current(twidget.sync_path, fingerprint):
+            return
 
-            export_to_compiled()
+        mixer = timeline_mixer(twidget.project_timeline, conform=conformed_source)
+        compiled_path = os.path.join(twidget.sync_path, "compiled.wav")
 
-        else:
-            twidget = self.timeline_widgets[speaker_name]
+        def export_to_compiled():
+            if not mixer.frame_count:
+                return 0
+            frame_rate, _ = mixer.output_format()
+            frames = write_wav_stream(mixer, compiled_path)
+            write_manifest(twidget.sync_path, fingerprint, frames / float(frame_rate))
+            return frames
 
+        def finished(future):
+            try:
+                if future.result():
+                    twidget.save_session()
+                    self.notify_compiled(twidget.sync_path)
+            except Exception as e:
+                print(f"[ERROR] Failed to export {compiled_path}: {e}")
+
+        when_done(self.background.submit(export_to_compiled), finished)
+
+    def clear_timeline_layout(self):
         for i in reversed(range(self.timeline_layout.count())):
             w = self.timeline_layout.itemAt(i).widget()
             if w:
                 w.setParent(None)
 
-        self.timeline_layout.addWidget(twidget)
+    def show_speaker_widget(self, widget, speaker_data):
+        self.clear_timeline_layout()
+        self.timeline_layout.addWidget(widget)
         self.audio_status_widget.update_status(speaker_data)
         self.timeline_layout.addWidget(self.audio_status_widget)
 
 
+def open_speaker_timeline(speaker_path, speaker_name):
+    """
+    Load a speaker's session, or create an empty 8-track timeline, then
+    replay edits journaled since the last save. Runs on a worker thread;
+    returns the timeline and how many edits were recovered.
+    """
+    if has_session(speaker_path):
+        timeline = load_speaker_session(speaker_path)
+    else:
+        timeline = Timeline(speaker_name)
+        for _ in range(8):
+            timeline.add_track(Track())
+
+    recovered = replay_journal(speaker_path, timeline)
+    if recovered:
+        # Persist the recovered state so the new journal starts from it
+        store = SessionStore(speaker_path)
+        try:
+            store.save(timeline)
+        finally:
+            store.close()
+        discard_journal(speaker_path)
+    return timeline, recovered
+
+
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     window = MainWindow()
@@ -0,0 +1,59 @@
+#render.py
+"""
+Headless renderer: mixes session.db/session.json into compiled.wav without Qt.
+
+    python render.py <speaker folder>
+    python render.py <sync root> [--workers N]
+    python render.py <sync root> --watch    # service export_request.json until Ctrl+C
+"""
+import argparse
+import os
+import sys
+import time
+
+from storage.export import export_all_speakers, export_speaker
+from storage.session_store import has_session
+from storage.sync_watcher import ExportRequestService
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render a saved session to compiled.wav without the editor UI.")
+    parser.add_argument("path", help="a speaker folder (containing session.db or session.json) or a sync root (containing speakers/)")
+    parser.add_argument("--workers", type=int, default=None, help="processes for a sync root (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="render even if compiled.wav is up to date")
+    parser.add_argument("--watch", action="store_true", help="keep running and export speakers whenever Blender requests it")
+    args = parser.parse_args(argv)
+
+    path = os.path.abspath(args.path)
+    if args.watch:
+        service = ExportRequestService(path, workers=args.workers)
+        service.start()
+        print(f"[SYNC] Watching {path} for export requests (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            service.stop()
+        return 0
+
+    if has_session(path):
+        result = export_speaker(path, force=args.force)
+        if result["error"]:
+            print(f"[ERROR] {result['name']}: {result['error']}")
+            return 1
+        if result["skipped"]:
+            print(f"[EXPORT] {result['name']}: up to date")
+            return 0
+        print(f"[EXPORT] {result['name']}: {result['duration']:.2f} s audio in {result['seconds']:.2f} s")
+        return 0
+
+    if os.path.isdir(os.path.join(path, "speakers")):
+        results = export_all_speakers(path, workers=args.workers, force=args.force)
+        return 1 if any(r["error"] for r in results) else 0
+
+    print(f"[ERROR] {path} is neither a speaker folder nor a sync root.")
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,18 +10,116 @@ bl_info = {
 
 
 import bpy
+import json
 import os
+import socket
 import time
 from bpy.app.handlers import persistent
-from bpy.props import PointerProperty, BoolProperty, FloatProperty
+from bpy.props import PointerProperty, BoolProperty, FloatProperty, StringProperty
 from bpy.types import PropertyGroup, Operator, Panel
 
 SYNC_FOLDER = "sf-synch"
 
+MANIFEST_NAME = "compiled.manifest.json"
+IPC_FILE = "ipc.json"
+IPC_POLL_INTERVAL = 0.1   # seconds between reads while connected
+IPC_RETRY_INTERVAL = 2.0  # seconds between connection attempts
+IPC_CONNECT_TIMEOUT = 0.5  # longest the UI waits on the socket
+
 # Data container for speaker sync info
 class SpeakerAudioData(PropertyGroup):
     initialized: BoolProperty(default=False)
     last_sync_time: FloatProperty(default=0.0)  # UNIX timestamp of last sync
+    compiled_signature: StringProperty(default="")  # what compiled.wav was at the last sync
+
+
+def compiled_path_for(obj):
+    return os.path.abspath(bpy.path.abspath(f"//{SYNC_FOLDER}/speakers/{obj.name}/compiled.wav"))
+
+
+def compiled_signature(compiled_path):
+    """
+    Identify the current compiled.wav: the mixer's render fingerprint when
+    its manifest describes this exact file (a re-render of an unchanged
+    session then counts as unchanged), otherwise its size and mtime.
+    """
+    try:
+        stat = os.stat(compiled_path)
+    except OSError:
+        return ""
+    identity = [stat.st_size, stat.st_mtime_ns]
+    try:
+        with open(os.path.join(os.path.dirname(compiled_path), MANIFEST_NAME), "r") as f:
+            manifest = json.load(f)
+        if manifest.get("compiled") == identity and manifest.get("fingerprint"):
+            return "render:" + manifest["fingerprint"]
+    except (OSError, ValueError, AttributeError):
+        pass
+    return f"file:{identity[0]}:{identity[1]}"
+
+
+def build_sound_index():
+    """Absolute file path -> sound datablocks using it, built once per sync."""
+    index = {}
+    for snd in bpy.data.sounds:
+        index.setdefault(os.path.abspath(bpy.path.abspath(snd.filepath)), []).append(snd)
+    return index
+
+
+def load_compiled_sound(speaker, compiled_path, sound_index):
+    """Point the speaker at a fresh read of compiled_path. Returns how it was done."""
+    # Case A: same sound already assigned -> force a disk reload
+    if speaker.sound and os.path.abspath(bpy.path.abspath(speaker.sound.filepath)) == compiled_path:
+        try:
+            speaker.sound.reload()  # re-read from disk
+            # bump a dummy value so Blender marks depsgraph dirty
+            speaker.volume = float(speaker.volume)
+            return "Reloaded (from disk)"
+        except Exception:
+            # fall through to hard reload path below
+            pass
+
+    # Case B: clean any cached datablocks that point to this file
+    for snd in sound_index.pop(compiled_path, []):
+        # clear users before removing
+        if speaker.sound == snd:
+            speaker.sound = None
+        snd.user_clear()
+        try:
+            bpy.data.sounds.remove(snd)
+        except RuntimeError:
+            # if still in use somewhere else, skip removal
+            pass
+
+    # Load fresh without reusing cache
+    sound = bpy.data.sounds.load(compiled_path, check_existing=False)
+    speaker.sound = sound
+    sound_index.setdefault(compiled_path, []).append(sound)
+    return "Loaded fresh"
+
+
+def sync_speaker(obj, sound_index, force=False):
+    """
+    Reload one speaker object's compiled.wav if it changed since the last
+    sync. Returns the action taken, None if it was up to date; raises
+    FileNotFoundError without a compiled.wav.
+    """
+    speaker = obj.data
+    compiled_path = compiled_path_for(obj)
+    if not os.path.isfile(compiled_path):
+        raise FileNotFoundError(f"No compiled.wav found for {obj.name}")
+
+    data = speaker.speaker_audio_data
+    signature = compiled_signature(compiled_path)
+    assigned = speaker.sound and os.path.abspath(bpy.path.abspath(speaker.sound.filepath)) == compiled_path
+    if not force and assigned and signature == data.compiled_signature:
+        return None
+
+    action = load_compiled_sound(speaker, compiled_path, sound_index)
+    data.compiled_signature = signature
+    data.last_sync_time = time.time()
+    return action
+
 
 class OBJECT_OT_sync_speaker_audio(Operator):
     bl_idname = "speaker.sync_audio"
@@ -33,69 +131,55 @@ class OBJECT_OT_sync_speaker_audio(Operator):
             self.report({'ERROR'}, "Active object is not a speaker.")
             return {'CANCELLED'}
 
-        speaker = obj.data
-
         # ensure custom prop exists
         try:
-            _ = speaker.speaker_audio_data
+            _ = obj.data.speaker_audio_data
         except Exception as e:
             self.report({'ERROR'}, f"Failed to access speaker_audio_data: {e}")
             return {'CANCELLED'}
 
-        compiled_audio_path = bpy.path.abspath(f"//{SYNC_FOLDER}/speakers/{obj.name}/compiled.wav")
-
-        if not os.path.isfile(compiled_audio_path):
-            self.report({'WARNING'}, f"No compiled.wav found for {obj.name}")
-            return {'CANCELLED'}
-
         try:
-            abs_target = os.path.abspath(compiled_audio_path)
-
-            # Case A: same sound already assigned -> force a disk reload
-            if speaker.sound and os.path.abspath(bpy.path.abspath(speaker.sound.filepath)) == abs_target:
-                try:
-                    speaker.sound.reload()  # re-read from disk
-                    # bump a dummy value so Blender marks depsgraph dirty
-                    speaker.volume = float(speaker.volume)
-                    speaker.speaker_audio_data.last_sync_time = time.time()
-                    self.report({'INFO'}, f"Reloaded (from disk): {compiled_audio_path}")
-                    return {'FINISHED'}
-                except Exception as e:
-                    # fall through to hard reload path below
-                    pass
-
-            # Case B: clean any cached datablocks that point to this file
-            to_remove = []
-            for snd in bpy.data.sounds:
-                if os.path.abspath(bpy.path.abspath(snd.filepath)) == abs_target:
-                    to_remove.append(snd)
-
-            # clear users before removing
-            for snd in to_remove:
-                if speaker.sound == snd:
-                    speaker.sound = None
-                snd.user_clear()
-                try:
-                    bpy.data.sounds.remove(snd)
-                except RuntimeError:
-                    # if still in use somewhere else, skip removal
-                    pass
-
-            # Load fresh without reusing cache
-            sound = bpy.data.sounds.load(compiled_audio_path, check_existing=False)
-            speaker.sound = sound
-
-            # optional: set last_sync_time, but we don't use it to block reloads anymore
-            speaker.speaker_audio_data.last_sync_time = time.time()
-
-            self.report({'INFO'}, f"Loaded fresh: {compiled_audio_path}")
+            # The button always reloads, even if nothing seems to have changed
+            action = sync_speaker(obj, build_sound_index(), force=True)
+            self.report({'INFO'}, f"{action}: {compiled_path_for(obj)}")
             return {'FINISHED'}
-
+        except FileNotFoundError as e:
+            self.report({'WARNING'}, str(e))
+            return {'CANCELLED'}
         except Exception as e:
             self.report({'ERROR'}, f"Failed to load/reload sound: {e}")
             return {'CANCELLED'}
 
 
+class SCENE_OT_sync_all_speakers(Operator):
+    bl_idname = "speaker.sync_all_audio"
+    bl_label = "Sync All Speakers"
+    bl_description = "Reload compiled.wav for every speaker in the scene whose audio changed"
+
+    def execute(self, context):
+        sound_index = build_sound_index()
+        synced, unchanged, missing, failed = [], 0, 0, []
+        for obj in context.scene.objects:
+            if obj.type != 'SPEAKER':
+                continue
+            try:
+                if sync_speaker(obj, sound_index):
+                    synced.append(obj.name)
+                else:
+                    unchanged += 1
+            except FileNotFoundError:
+                missing += 1
+            except Exception as e:
+                failed.append(f"{obj.name} ({e})")
+
+        message = f"Synced {len(synced)}, unchanged {unchanged}, without audio {missing}"
+        if failed:
+            self.report({'WARNING'}, f"{message}; failed: {', '.join(failed)}")
+        else:
+            self.report({'INFO'}, message)
+        return {'FINISHED'}
+
+
 class OBJECT_OT_request_audio_export(Operator):
     bl_idname = "speaker.request_export"
     bl_label = "Request Export from Audio Mixer"
@@ -111,6 +195,11 @@ class OBJECT_OT_request_audio_export(Operator):
             self.report({'ERROR'}, "Save the .blend file first.")
             return {'CANCELLED'}
 
+        # A running mixer gets the request immediately over the channel
+        if mixer_channel.send({"type": "export_request", "speaker": obj.name}):
+            self.report({'INFO'}, f"Export requested from the audio mixer for {obj.name}")
+            return {'FINISHED'}
+
         base_dir = os.path.dirname(blend_path)
         speaker_dir = os.path.join(base_dir, SYNC_FOLDER, "speakers", obj.name)
         os.makedirs(speaker_dir, exist_ok=True)
@@ -125,6 +214,120 @@ class OBJECT_OT_request_audio_export(Operator):
 
         return {'FINISHED'}
 
+# === Live channel to the audio mixer ===
+# The mixer advertises a localhost port and token in <sync folder>/ipc.json.
+# Messages are JSON lines: we send export requests, it sends compiled_ready
+# when a speaker's compiled.wav has been written. Without a running mixer
+# the export_request.json / manual sync path is used instead.
+
+class MixerChannel:
+    def __init__(self):
+        self.sock = None
+        self.buffer = b""
+
+    @property
+    def connected(self):
+        return self.sock is not None
+
+    def connect(self):
+        """Connect and authenticate; only a peer that answers with welcome counts."""
+        sock = None
+        try:
+            with open(bpy.path.abspath(f"//{SYNC_FOLDER}/{IPC_FILE}"), "r") as f:
+                info = json.load(f)
+            sock = socket.create_connection(("127.0.0.1", int(info["port"])), timeout=IPC_CONNECT_TIMEOUT)
+            sock.sendall((json.dumps({"type": "hello", "token": info["token"], "peer": "blender"}) + "\n").encode("utf-8"))
+            # The editor answers at once; anything else (a stale port now
+            # used by another program, an old token) is not the mixer
+            buffer = b""
+            deadline = time.monotonic() + IPC_CONNECT_TIMEOUT
+            while b"\n" not in buffer:
+                sock.settimeout(max(0.001, deadline - time.monotonic()))
+                data = sock.recv(4096)
+                if not data:
+                    raise ConnectionError("closed before welcome")
+                buffer += data
+            line, buffer = buffer.split(b"\n", 1)
+            if json.loads(line.decode("utf-8")).get("type") != "welcome":
+                raise ConnectionError("no welcome")
+            sock.setblocking(False)
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            if sock is not None:
+                sock.close()
+            return False
+        self.sock = sock
+        self.buffer = buffer
+        return True
+
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+    def send(self, message):
+        if self.sock is None and not self.connect():
+            return False
+        try:
+            self.sock.settimeout(IPC_CONNECT_TIMEOUT)
+            self.sock.sendall((json.dumps(message) + "\n").encode("utf-8"))
+            self.sock.setblocking(False)
+            return True
+        except OSError:
+            self.close()
+            return False
+
+    def poll(self):
+        """Messages received since the last poll; never blocks."""
+        messages = []
+        while self.sock is not None:
+            try:
+                data = self.sock.recv(65536)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                data = b""
+            if not data:
+                self.close()
+                break
+            self.buffer += data
+        while b"\n" in self.buffer:
+            line, self.buffer = self.buffer.split(b"\n", 1)
+            try:
+                messages.append(json.loads(line.decode("utf-8")))
+            except ValueError:
+                pass
+        return messages
+
+
+mixer_channel = MixerChannel()
+
+
+def apply_compiled_ready(message):
+    obj = bpy.data.objects.get(message.get("speaker") or "")
+    if obj is None or obj.type != 'SPEAKER':
+        return
+    try:
+        action = sync_speaker(obj, build_sound_index())
+    except FileNotFoundError:
+        return
+    except Exception as e:
+        print(f"[Speaker Sync] Failed to reload {obj.name}: {e}")
+        return
+    if action:
+        print(f"[Speaker Sync] {action}: {obj.name}")
+
+
+def mixer_channel_timer():
+    if not bpy.data.filepath:
+        return IPC_RETRY_INTERVAL
+    if not mixer_channel.connected and not mixer_channel.connect():
+        return IPC_RETRY_INTERVAL
+    for message in mixer_channel.poll():
+        if isinstance(message, dict) and message.get("type") == "compiled_ready":
+            apply_compiled_ready(message)
+    return IPC_POLL_INTERVAL if mixer_channel.connected else IPC_RETRY_INTERVAL
+
+
 class OBJECT_PT_speaker_audio_panel(Panel):
     bl_label = "External Audio Mixer"
     bl_idname = "OBJECT_PT_speaker_audio_panel"
@@ -140,34 +343,119 @@ class OBJECT_PT_speaker_audio_panel(Panel):
         layout = self.layout
         layout.operator("speaker.sync_audio", icon='FILE_REFRESH')
         layout.operator("speaker.request_export", icon='EXPORT')
+        layout.separator()
+        layout.operator("speaker.sync_all_audio", icon='FILE_REFRESH')
 
-# Auto-create speaker sync folders and initialize property
-@persistent
-def auto_initialize_speaker_folders(scene):
+# === Speaker folder initialization ===
+# Folders are created when speakers appear (add, duplicate, link, file load)
+# and renamed along with their object. The depsgraph handler only compares
+# the object count, so transform drags and frame changes cost next to nothing.
+
+_known_speakers = {}  # object pointer -> name its folder was created under
+_object_count = -1
+_msgbus_owner = object()
+_channel_dir = None  # speakers folder the mixer channel was opened for
+
+
+def speakers_dir():
     blend_path = bpy.data.filepath
     if not blend_path:
+        return None
+    return os.path.join(os.path.dirname(blend_path), SYNC_FOLDER, "speakers")
+
+
+def ensure_speaker_folder(obj, sync_dir, old_name=None):
+    speaker_dir = os.path.join(sync_dir, obj.name)
+    try:
+        old_dir = os.path.join(sync_dir, old_name) if old_name else None
+        if old_dir and os.path.isdir(old_dir) and not os.path.exists(speaker_dir):
+            os.rename(old_dir, speaker_dir)
+        else:
+            os.makedirs(speaker_dir, exist_ok=True)
+    except OSError as e:
+        print(f"[Speaker Sync] Could not prepare {speaker_dir}: {e}")
+        return
+    try:
+        obj.data.speaker_audio_data.initialized = True
+    except AttributeError:
+        pass
+    _known_speakers[obj.as_pointer()] = obj.name
+
+
+def scan_speakers(renamed=False):
+    """
+    Bring the speaker folders in line with the speaker objects. With renamed
+    set, a known object under a new name moves its folder; otherwise new
+    names just get a folder (object pointers can be reused after a delete).
+    """
+    global _object_count
+    _object_count = len(bpy.data.objects)
+    sync_dir = speakers_dir()
+    if sync_dir is None:
         return
 
-    base_dir = os.path.dirname(blend_path)
-    sync_dir = os.path.join(base_dir, SYNC_FOLDER, "speakers")
+    current = {}
+    for obj in bpy.data.objects:
+        if obj.type == 'SPEAKER':
+            current[obj.as_pointer()] = obj
+    for key in list(_known_speakers):
+        if key not in current:
+            del _known_speakers[key]
+
     os.makedirs(sync_dir, exist_ok=True)
+    for key, obj in current.items():
+        old_name = _known_speakers.get(key)
+        if old_name != obj.name:
+            ensure_speaker_folder(obj, sync_dir, old_name if renamed else None)
 
-    for obj in scene.objects:
-        if obj.type == 'SPEAKER':
-            speaker = obj.data
-            try:
-                _ = speaker.speaker_audio_data  # Trigger init
-            except:
-                continue
-            data = speaker.speaker_audio_data
-            if not data.initialized:
-                speaker_dir = os.path.join(sync_dir, obj.name)
-                os.makedirs(speaker_dir, exist_ok=True)
-                data.initialized = True
+
+def on_object_renamed():
+    scan_speakers(renamed=True)
+
+
+def subscribe_renames():
+    bpy.msgbus.clear_by_owner(_msgbus_owner)
+    bpy.msgbus.subscribe_rna(
+        key=(bpy.types.Object, "name"),
+        owner=_msgbus_owner,
+        args=(),
+        notify=on_object_renamed,
+    )
+
+
+@persistent
+def auto_initialize_speaker_folders(scene, depsgraph=None):
+    # Steady state: one len() per update
+    if len(bpy.data.objects) != _object_count:
+        scan_speakers()
+
+
+@persistent
+def reset_speaker_folders(*_):
+    # New file or first save (the sync folder is now known): pointers and
+    # paths may all have changed, so start from scratch
+    global _channel_dir
+    _known_speakers.clear()
+    subscribe_renames()
+    scan_speakers()
+    # Only when the sync folder moved (new file, Save As elsewhere) does the
+    # mixer serving it change; a plain save keeps the channel up
+    sync_dir = speakers_dir()
+    if sync_dir != _channel_dir:
+        mixer_channel.close()
+        _channel_dir = sync_dir
+
+
+@persistent
+def rescan_speaker_folders(*_):
+    # Undo/redo can restore a speaker's earlier name: move its folder back
+    # with it, using the names the folders are under now
+    scan_speakers(renamed=True)
 
 classes = (
     SpeakerAudioData,
     OBJECT_OT_sync_speaker_audio,
+    SCENE_OT_sync_all_speakers,
     OBJECT_OT_request_audio_export,
     OBJECT_PT_speaker_audio_panel,
 )
@@ -177,8 +465,24 @@ def register():
         bpy.utils.register_class(cls)
     bpy.types.Speaker.speaker_audio_data = PointerProperty(type=SpeakerAudioData)
     bpy.app.handlers.depsgraph_update_post.append(auto_initialize_speaker_folders)
+    for handlers in (bpy.app.handlers.load_post, bpy.app.handlers.save_post):
+        handlers.append(reset_speaker_folders)
+    for handlers in (bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+        handlers.append(rescan_speaker_folders)
+    subscribe_renames()
+    bpy.app.timers.register(mixer_channel_timer, first_interval=IPC_POLL_INTERVAL, persistent=True)
 
 def unregister():
+    if bpy.app.timers.is_registered(mixer_channel_timer):
+        bpy.app.timers.unregister(mixer_channel_timer)
+    mixer_channel.close()
+    bpy.msgbus.clear_by_owner(_msgbus_owner)
+    for handlers in (bpy.app.handlers.load_post, bpy.app.handlers.save_post):
+        if reset_speaker_folders in handlers:
+            handlers.remove(reset_speaker_folders)
+    for handlers in (bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+        if rescan_speaker_folders in handlers:
+            handlers.remove(rescan_speaker_folders)
     bpy.app.handlers.depsgraph_update_post.remove(auto_initialize_speaker_folders)
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
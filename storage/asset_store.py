@@ -0,0 +1,194 @@
+#storage\asset_store.py
+import errno
+import hashlib
+import os
+import re
+import shutil
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from core.audio_source import open_source
+from storage.atomic_file import temp_path
+
+HASH_CHUNK = 1024 * 1024
+COPY_CHUNK = 1024 * 1024
+HASH_LENGTH = 16  # hex digits of the content hash kept in the asset name
+FICLONE = 0x40049409  # Linux ioctl: share the source's extents (btrfs, xfs, ...)
+
+
+def sync_root_for_speaker(speaker_path):
+    """The sync folder a speakers/<name> folder belongs to."""
+    return os.path.abspath(os.path.join(speaker_path, os.pardir, os.pardir))
+
+
+def hash_file(path) -> str:
+    """Streamed sha256 of a file, read in HASH_CHUNK pieces."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+_hashes = {}  # (abspath, size, mtime_ns) -> sha256
+_ASSET_HASH = re.compile(r"-([0-9a-f]{%d})$" % HASH_LENGTH)
+_hashes_lock = threading.Lock()
+
+
+def content_hash(path) -> str:
+    """hash_file, remembered per file identity so unchanged files are hashed once."""
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    with _hashes_lock:
+        if key in _hashes:
+            return _hashes[key]
+    digest = hash_file(path)
+    with _hashes_lock:
+        _hashes[key] = digest
+    return digest
+
+
+def known_digest(path):
+    """asset_digest if it is known without reading the file, else None."""
+    path = os.path.abspath(path)
+    match = _ASSET_HASH.search(os.path.splitext(os.path.basename(path))[0])
+    if match and os.path.basename(os.path.dirname(path)) == "assets":
+        return match.group(1)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    with _hashes_lock:
+        digest = _hashes.get((path, stat.st_size, stat.st_mtime_ns))
+    return digest[:HASH_LENGTH] if digest else None
+
+
+def asset_digest(path) -> str:
+    """Short content hash of a file; assets in the store carry it in their name."""
+    return known_digest(path) or content_hash(path)[:HASH_LENGTH]
+
+
+def _reflink(src, dst):
+    if not sys.platform.startswith("linux"):
+        raise OSError(errno.EOPNOTSUPP, "reflink is only tried on Linux")
+    import fcntl
+
+    with open(src, "rb") as s, open(dst, "wb") as d:
+        fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+
+
+def _stream_copy(src, dst):
+    with open(src, "rb") as s, open(dst, "wb") as d:
+        shutil.copyfileobj(s, d, COPY_CHUNK)
+        d.flush()
+        os.fsync(d.fileno())
+
+
+def place_file(src, dst) -> str:
+    """
+    Put a copy of src at dst as cheaply as the filesystem allows: a reflink,
+    then a chunked copy. The result appears atomically. Returns the method
+    used. Never a hardlink: editing the original in place would change the
+    asset under its content-hash name.
+    """
+    for method, place in (("reflink", _reflink), ("copy", _stream_copy)):
+        tmp_path = temp_path(dst)
+        try:
+            place(src, tmp_path)
+            os.replace(tmp_path, dst)
+            return method
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            if method == "copy":
+                raise
+
+
+_placing = {}  # content hash -> lock held while that content is placed
+_placing_lock = threading.Lock()
+
+
+class AssetStore:
+    """
+    Content-addressed audio store in <sync>/assets. Each imported file is
+    named <stem>-<hash><ext>, so files that share a basename never overwrite
+    each other and the same audio imported twice is stored once. Assets
+    are treated as immutable and never share storage with the original
+    except as a copy-on-write reflink.
+    """
+
+    def __init__(self, sync_path):
+        self.sync_path = os.path.abspath(sync_path)
+        self.asset_dir = os.path.join(self.sync_path, "assets")
+
+    @classmethod
+    def for_speaker(cls, speaker_path):
+        return cls(sync_root_for_speaker(speaker_path))
+
+    def contains(self, path) -> bool:
+        return os.path.dirname(os.path.abspath(path)) == self.asset_dir
+
+    def asset_name(self, path, digest) -> str:
+        stem, ext = os.path.splitext(os.path.basename(path))
+        suffix = f"-{digest[:HASH_LENGTH]}"
+        if stem.endswith(suffix):
+            return stem + ext.lower()
+        return f"{stem}{suffix}{ext.lower()}"
+
+    def import_file(self, path) -> str:
+        """Return the asset path for path's content, adding it to the store if needed."""
+        path = os.path.abspath(path)
+        if self.contains(path):
+            # Already in the store (including assets from before it was hashed)
+            return path
+
+        digest = content_hash(path)
+        asset_path = os.path.join(self.asset_dir, self.asset_name(path, digest))
+        # Concurrent imports of the same content wait for the first one
+        with _placing_lock:
+            lock = _placing.setdefault(digest, threading.Lock())
+        with lock:
+            if os.path.exists(asset_path):
+                if os.stat(asset_path).st_nlink > 1:
+                    # Hardlinked by an earlier import: give the asset its own copy
+                    place_file(asset_path, asset_path)
+                return asset_path
+
+            os.makedirs(self.asset_dir, exist_ok=True)
+            method = place_file(path, asset_path)
+        print(f"[INFO] Imported {os.path.basename(path)} as {os.path.basename(asset_path)} ({method})")
+        return asset_path
+
+
+_import_pool = None
+
+
+def _import_executor():
+    global _import_pool
+    if _import_pool is None:
+        _import_pool = ThreadPoolExecutor(max_workers=2)
+    return _import_pool
+
+
+def import_in_background(store: AssetStore, path):
+    """Hash and place a file on a worker thread; returns a Future of the asset path."""
+    return _import_executor().submit(store.import_file, path)
+
+
+def _import_and_open(store, path):
+    asset_path = store.import_file(path)
+    source = open_source(asset_path)
+    source.info  # compressed files are decoded here, not where the clip is made
+    return asset_path, source
+
+
+def open_in_background(store: AssetStore, path):
+    """
+    import_in_background, then open the asset and read its stream info on
+    the same worker. Returns a Future of (asset path, source).
+    """
+    return _import_executor().submit(_import_and_open, store, path)
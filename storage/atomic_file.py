@@ -0,0 +1,39 @@
+#storage\atomic_file.py
+import os
+import secrets
+from contextlib import contextmanager
+
+
+def temp_path(path) -> str:
+    """
+    Name for a hidden temporary file next to path, to be renamed over it.
+    Unique per call, so concurrent writers of the same path (threads or
+    processes) never share one.
+    """
+    return os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.{secrets.token_hex(8)}.tmp")
+
+
+@contextmanager
+def atomic_write(path, mode="wb", fsync=True):
+    """
+    Write path through a temporary file that is renamed into place once the
+    block completes, so readers (Blender, other editors) only ever see the
+    old or the new file. On error the temporary file is removed. Caches that
+    are cheap to rebuild can skip the fsync.
+    """
+    tmp_path = temp_path(path)
+    # Exclusive create: never write into a file someone else made
+    f = open(tmp_path, mode.replace("w", "x"))
+    try:
+        with f:
+            yield f
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
@@ -0,0 +1,114 @@
+#storage\conform_cache.py
+import os
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from core.audio_source import WAVE_FORMAT_IEEE_FLOAT, WavSource, open_source
+from core.mixer import conform_channels, read_resampled
+from storage.asset_store import asset_digest, known_digest
+from storage.atomic_file import atomic_write
+
+CONFORM_DIR = ".conformed"
+CONFORM_CHUNK = 1 << 18  # output frames transcoded per step
+
+
+def conform_path(source, frame_rate, channels, digest=None):
+    """Hidden .conformed/ folder beside the audio file, one file per content hash and format."""
+    folder = os.path.join(os.path.dirname(os.path.abspath(source.path)), CONFORM_DIR)
+    digest = digest or asset_digest(source.path)
+    return os.path.join(folder, f"{digest}.{frame_rate}x{channels}.f32.wav")
+
+
+def _float_wav_header(frame_rate, channels, frame_count):
+    block_align = 4 * channels
+    data_size = frame_count * block_align
+    fmt = struct.pack("<HHIIHH", WAVE_FORMAT_IEEE_FLOAT, channels, frame_rate,
+                      frame_rate * block_align, block_align, 32)
+    return (struct.pack("<4sI4s", b"RIFF", 4 + 8 + len(fmt) + 8 + data_size, b"WAVE")
+            + struct.pack("<4sI", b"fmt ", len(fmt)) + fmt
+            + struct.pack("<4sI", b"data", data_size))
+
+
+def transcode(source, frame_rate, channels, path):
+    """Stream source into a float32 WAV at frame_rate/channels, a chunk at a time."""
+    frame_count = int(round(source.frame_count * frame_rate / float(source.frame_rate)))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with atomic_write(path) as f:
+        f.write(_float_wav_header(frame_rate, channels, frame_count))
+        for offset in range(0, frame_count, CONFORM_CHUNK):
+            count = min(CONFORM_CHUNK, frame_count - offset)
+            frames = read_resampled(source, 0, source.frame_count, offset, count, frame_rate)
+            frames = conform_channels(frames, channels)
+            if len(frames) < count:
+                frames = np.concatenate([frames, np.zeros((count - len(frames), channels), np.float32)])
+            f.write(frames.astype("<f4").tobytes())
+
+
+def conformed_source(source, frame_rate, channels):
+    """
+    The source's audio at the mix format, transcoded once and memory-mapped
+    from then on, so repeat mixes (in any process) never decode compressed
+    files or resample again. Returns None if there is no file to key it by.
+    """
+    if source.path is None:
+        return None
+    if isinstance(source, WavSource) and (source.frame_rate, source.channels) == (frame_rate, channels):
+        return source
+    try:
+        path = conform_path(source, frame_rate, channels)
+        if not os.path.exists(path):
+            transcode(source, frame_rate, channels, path)
+        return open_source(path)
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] Could not conform {source.path}: {e}")
+        return None
+
+
+_conform_pool = None
+_pending = set()
+_pending_lock = threading.Lock()
+
+
+def _conform_job(key, source, frame_rate, channels):
+    try:
+        conformed_source(source, frame_rate, channels)
+    finally:
+        with _pending_lock:
+            _pending.discard(key)
+
+
+def cached_conformed_source(source, frame_rate, channels):
+    """
+    conformed_source for the GUI thread: never hashes or transcodes. Returns
+    the conformed source if its file is already cached; otherwise queues the
+    transcode on a worker and returns None, so this mix resamples live and
+    later ones read the cached file.
+    """
+    global _conform_pool
+    if source.path is None:
+        return None
+    if isinstance(source, WavSource) and (source.frame_rate, source.channels) == (frame_rate, channels):
+        return source
+
+    digest = known_digest(source.path)
+    if digest is not None:
+        path = conform_path(source, frame_rate, channels, digest)
+        if os.path.exists(path):
+            try:
+                return open_source(path)
+            except (OSError, ValueError) as e:
+                print(f"[ERROR] Could not open {path}: {e}")
+                return None
+
+    key = (os.path.abspath(source.path), frame_rate, channels)
+    with _pending_lock:
+        if key in _pending:
+            return None
+        _pending.add(key)
+    if _conform_pool is None:
+        _conform_pool = ThreadPoolExecutor(max_workers=1)
+    _conform_pool.submit(_conform_job, key, source, frame_rate, channels)
+    return None
@@ -0,0 +1,106 @@
+#storage\export.py
+import multiprocessing
+import os
+import time
+import wave
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from core.audio_source import to_pcm16
+from core.mixer import timeline_mixer
+from storage.atomic_file import atomic_write
+from storage.render_manifest import (
+    COMPILED_NAME, is_compiled_current, read_manifest, timeline_fingerprint, write_manifest
+)
+from storage.conform_cache import conformed_source
+from storage.session_store import has_session, load_speaker_session
+from ui.project_sync import ProjectSyncManager
+
+EXPORT_BLOCK_FRAMES = 1 << 16
+
+
+def write_wav_stream(source, path: str, block_frames: int = EXPORT_BLOCK_FRAMES) -> int:
+    """
+    Render a block source (a Mixer or MixCache) into 16-bit PCM one block at
+    a time, so memory stays at one block however long the mix is. The file
+    is written next to `path`, the wave module patches the RIFF and data
+    sizes on close, and it is fsynced and renamed into place, so readers
+    (Blender) never see a half-written file. Returns the frames written.
+    """
+    frame_rate, channels = source.output_format()
+    frame_count = source.frame_count
+    with atomic_write(path) as f:
+        with wave.open(f, "wb") as wav:
+            wav.setnchannels(channels)
+            wav.setsampwidth(2)
+            wav.setframerate(frame_rate)
+            for start in range(0, frame_count, block_frames):
+                frames = source.render(start, min(block_frames, frame_count - start))
+                wav.writeframes(to_pcm16(frames).tobytes())
+    return frame_count
+
+
+def export_speaker(speaker_path: str, force: bool = False) -> dict:
+    """
+    Mix one speaker's session into compiled.wav, unless the render
+    manifest shows compiled.wav is already current. Safe to run in a
+    worker process.
+    """
+    started = time.perf_counter()
+    result = {"name": os.path.basename(speaker_path), "path": speaker_path, "duration": 0.0,
+              "error": None, "skipped": False}
+    try:
+        timeline = load_speaker_session(speaker_path)
+        fingerprint = timeline_fingerprint(timeline)
+        if not force and is_compiled_current(speaker_path, fingerprint):
+            result["skipped"] = True
+            result["duration"] = (read_manifest(speaker_path) or {}).get("duration") or 0.0
+        else:
+            mixer = timeline_mixer(timeline, conform=conformed_source)
+            frame_rate, _ = mixer.output_format()
+            frames = write_wav_stream(mixer, os.path.join(speaker_path, COMPILED_NAME))
+            result["duration"] = frames / float(frame_rate)
+            write_manifest(speaker_path, fingerprint, result["duration"])
+    except Exception as e:
+        result["error"] = str(e)
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+
+def find_exportable_speakers(sync_path: str):
+    manager = ProjectSyncManager()
+    manager.set_sync_folder(sync_path)
+    return [
+        speaker["path"] for speaker in manager.get_speaker_list()
+        if has_session(speaker["path"])
+    ]
+
+
+def export_all_speakers(sync_path: str, workers: int = None, speaker_paths=None, force: bool = False):
+    """
+    Re-export compiled.wav for every speaker with a saved session, mixing
+    speakers in parallel across a process pool. Prints a per-speaker
+    timing summary and returns the per-speaker results.
+    """
+    if speaker_paths is None:
+        speaker_paths = find_exportable_speakers(sync_path)
+    if not speaker_paths:
+        print("[EXPORT] No speakers with a saved session found.")
+        return []
+
+    started = time.perf_counter()
+    workers = min(workers or os.cpu_count() or 1, len(speaker_paths))
+    # spawn keeps workers independent of any Qt state in the parent process
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        results = list(pool.map(partial(export_speaker, force=force), speaker_paths))
+
+    print(f"[EXPORT] {len(results)} speakers with {workers} workers in {time.perf_counter() - started:.2f} s")
+    for result in sorted(results, key=lambda r: r["name"]):
+        if result["error"]:
+            print(f"  {result['name']:<24} FAILED after {result['seconds']:.2f} s: {result['error']}")
+        elif result["skipped"]:
+            print(f"  {result['name']:<24} {result['duration']:8.2f} s audio  up to date")
+        else:
+            print(f"  {result['name']:<24} {result['duration']:8.2f} s audio  {result['seconds']:6.2f} s")
+    return results
@@ -0,0 +1,170 @@
+#storage\ipc.py
+"""
+Local notification channel between the editor and the Blender add-on.
+
+Newline-delimited JSON over a localhost TCP socket. The editor listens and
+advertises the port and a per-run token in <sync>/ipc.json; a peer must
+send {"type": "hello", "token": ...} before anything else. Messages:
+
+    peer -> editor   {"type": "export_request", "speaker": name}
+    editor -> peer   {"type": "compiled_ready", "speaker": name,
+                      "path": ..., "fingerprint": ..., "duration": ...}
+
+export_request.json and polling compiled.wav keep working when no channel
+is up.
+"""
+import json
+import os
+import secrets
+import socket
+import threading
+
+from storage.atomic_file import atomic_write
+
+IPC_FILE = "ipc.json"
+PROTOCOL_VERSION = 1
+MAX_LINE = 64 * 1024
+
+
+def encode(message) -> bytes:
+    return (json.dumps(message) + "\n").encode("utf-8")
+
+
+class LineReader:
+    """Splits a byte stream into decoded JSON messages."""
+
+    def __init__(self):
+        self._buffer = b""
+
+    def feed(self, data):
+        self._buffer += data
+        messages = []
+        while b"\n" in self._buffer:
+            line, self._buffer = self._buffer.split(b"\n", 1)
+            try:
+                message = json.loads(line.decode("utf-8"))
+            except ValueError:
+                continue
+            if isinstance(message, dict):
+                messages.append(message)
+        if len(self._buffer) > MAX_LINE:
+            raise ValueError("message too long")
+        return messages
+
+
+def read_endpoint(sync_path):
+    """The (port, token) advertised in ipc.json, or None."""
+    try:
+        with open(os.path.join(sync_path, IPC_FILE), "r") as f:
+            info = json.load(f)
+        return int(info["port"]), info["token"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _shutdown(sock):
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+
+class SyncServer:
+    """
+    Listens on 127.0.0.1 for peers (Blender) and calls
+    on_message(message) from a reader thread for every message an
+    authenticated peer sends. broadcast() pushes a message to all of them.
+    """
+
+    def __init__(self, sync_path, on_message):
+        self.sync_path = sync_path
+        self.on_message = on_message
+        self.token = secrets.token_hex(16)
+        self._clients = set()
+        self._lock = threading.Lock()
+        self._socket = None
+        self._thread = None
+
+    @property
+    def endpoint_path(self):
+        return os.path.join(self.sync_path, IPC_FILE)
+
+    def start(self):
+        self._socket = socket.create_server(("127.0.0.1", 0))
+        port = self._socket.getsockname()[1]
+        with atomic_write(self.endpoint_path, "w", fsync=False) as f:
+            json.dump({"port": port, "token": self.token, "pid": os.getpid(),
+                       "version": PROTOCOL_VERSION}, f)
+        self._thread = threading.Thread(target=self._accept, daemon=True)
+        self._thread.start()
+        return port
+
+    def stop(self):
+        if self._socket is None:
+            return
+        # Only withdraw the advertisement if it is still ours
+        endpoint = read_endpoint(self.sync_path)
+        if endpoint and endpoint[1] == self.token:
+            try:
+                os.remove(self.endpoint_path)
+            except OSError:
+                pass
+        # close() alone does not wake threads blocked in accept()/recv()
+        _shutdown(self._socket)
+        self._socket.close()
+        with self._lock:
+            clients, self._clients = self._clients, set()
+        for conn in clients:
+            _shutdown(conn)
+            conn.close()
+        self._thread.join()
+        self._socket = None
+
+    def broadcast(self, message):
+        data = encode(message)
+        with self._lock:
+            clients = list(self._clients)
+        for conn in clients:
+            try:
+                conn.sendall(data)
+            except OSError:
+                self._drop(conn)
+
+    def _drop(self, conn):
+        with self._lock:
+            self._clients.discard(conn)
+        conn.close()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self._socket.accept()
+            except OSError:
+                return  # closed by stop()
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        reader = LineReader()
+        authenticated = False
+        try:
+            while True:
+                data = conn.recv(4096)
+                if not data:
+                    break
+                for message in reader.feed(data):
+                    if not authenticated:
+                        if message.get("type") != "hello" or message.get("token") != self.token:
+                            return
+                        authenticated = True
+                        with self._lock:
+                            self._clients.add(conn)
+                        conn.sendall(encode({"type": "welcome", "version": PROTOCOL_VERSION}))
+                        continue
+                    try:
+                        self.on_message(message)
+                    except Exception as e:
+                        print(f"[ERROR] IPC message {message} failed: {e}")
+        except (OSError, ValueError):
+            pass
+        finally:
+            self._drop(conn)
@@ -0,0 +1,161 @@
+#storage\journal.py
+import json
+import os
+import queue
+import threading
+import time
+
+from core.audio_clip import AudioClip
+from storage.render_manifest import timeline_fingerprint
+
+JOURNAL_NAME = "session.journal"
+FSYNC_INTERVAL = 0.5  # seconds of edits that share one fsync
+
+
+def _placement(clip):
+    return {"start_time": clip.start_time, "trim_start": clip.trim_start, "trim_end": clip.trim_end}
+
+
+class EditJournal:
+    """
+    Append-only log of model edits since the session was last saved, kept
+    as session.journal (one JSON record per line) in the speaker folder.
+    Recording an edit only serialises one small record and queues it; a
+    writer thread appends and fsyncs whatever queued up in the last
+    FSYNC_INTERVAL, so the cost per edit does not grow with the session.
+    The first record holds the fingerprint of the saved session the edits
+    apply to.
+    """
+
+    def __init__(self, speaker_path, fsync_interval=FSYNC_INTERVAL):
+        self.path = os.path.join(speaker_path, JOURNAL_NAME)
+        self.fsync_interval = fsync_interval
+        self.timeline = None
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def attach(self, timeline):
+        """Start journaling edits to timeline, which must match the saved session."""
+        self.timeline = timeline
+        for track in timeline.tracks:
+            track.observer = self.on_edit
+        self.checkpoint()
+
+    def checkpoint(self):
+        """The session was just saved: start over from an empty journal."""
+        base = {"op": "base", "fingerprint": timeline_fingerprint(self.timeline)}
+        self._queue.put(("reset", json.dumps(base)))
+
+    def on_edit(self, track, op, clip, index):
+        record = {"op": op, "track": self.timeline.tracks.index(track), "index": index}
+        if op == "add":
+            record["file"] = os.path.abspath(clip.source_path or clip.file_path)
+        if op != "remove":
+            record.update(_placement(clip))
+        self._queue.put(("append", json.dumps(record)))
+
+    def flush(self):
+        """Block until every queued record is on disk."""
+        done = threading.Event()
+        self._queue.put(("flush", done))
+        done.wait()
+
+    def close(self):
+        if self.timeline is not None:
+            for track in self.timeline.tracks:
+                if track.observer == self.on_edit:
+                    track.observer = None
+        self._queue.put(("close", None))
+        self._thread.join()
+
+    def _run(self):
+        f = None
+        try:
+            while True:
+                batch = [self._queue.get()]
+                # Group commit: gather what else arrives within one interval
+                # of the first record, so no edit waits longer than that
+                deadline = time.monotonic() + self.fsync_interval
+                while batch[-1][0] == "append":
+                    try:
+                        batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                    except queue.Empty:
+                        break
+
+                for kind, payload in batch:
+                    if kind == "reset":
+                        if f is not None:
+                            f.close()
+                        f = open(self.path, "w", encoding="utf-8")
+                        f.write(payload + "\n")
+                    elif kind == "append" and f is not None:
+                        f.write(payload + "\n")
+                if f is not None:
+                    f.flush()
+                    os.fsync(f.fileno())
+
+                for kind, payload in batch:
+                    if kind == "flush":
+                        payload.set()
+                    elif kind == "close":
+                        return
+        except OSError as e:
+            print(f"[ERROR] Edit journal {self.path} stopped: {e}")
+        finally:
+            if f is not None:
+                f.close()
+
+
+def discard_journal(speaker_path):
+    """Drop the journal once its edits are part of a saved session."""
+    try:
+        os.remove(os.path.join(speaker_path, JOURNAL_NAME))
+    except FileNotFoundError:
+        pass
+
+
+def replay_journal(speaker_path, timeline) -> int:
+    """
+    Apply the edits journaled after the last save to a freshly loaded
+    timeline. Returns how many were applied; a journal recorded against
+    a different saved session is ignored.
+    """
+    path = os.path.join(speaker_path, JOURNAL_NAME)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return 0
+
+    records = []
+    for line in lines:
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            break  # torn write at the crash; everything before it is good
+    if not records or records[0].get("op") != "base":
+        return 0
+    if records[0].get("fingerprint") != timeline_fingerprint(timeline):
+        print(f"[INFO] Ignoring {path}: it was recorded against a different save")
+        return 0
+
+    applied = 0
+    for record in records[1:]:
+        try:
+            track = timeline.tracks[record["track"]]
+            if record["op"] == "add":
+                clip = AudioClip(record["file"], start_time=record["start_time"],
+                                 trim_start=record["trim_start"], trim_end=record["trim_end"])
+                clip.source_path = record["file"]
+                track.insert_clip(record["index"], clip)
+            elif record["op"] == "remove":
+                track.remove_clip(track.clips[record["index"]])
+            elif record["op"] == "place":
+                track.clips[record["index"]].set_placement(
+                    record["start_time"], record["trim_start"], record["trim_end"])
+            applied += 1
+        except (KeyError, IndexError, OSError, ValueError) as e:
+            print(f"[ERROR] Stopped replaying {path} at {record}: {e}")
+            break
+    return applied
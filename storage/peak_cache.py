@@ -0,0 +1,136 @@
+#storage\peak_cache.py
+import hashlib
+import os
+import struct
+
+import numpy as np
+
+from core.audio_source import AudioSource, to_pcm16
+from core.peaks import BASE_BLOCK, PeakPyramid
+from storage.atomic_file import atomic_write
+
+PEAK_DIR = ".peaks"
+PEAK_EXT = ".pk"
+MAX_CACHE_BYTES = 256 * 1024 ** 2  # per asset folder
+
+# magic, version, base block, frame count, source size, source mtime_ns, entries
+_HEADER = struct.Struct("<4sHIQQQQ")
+_MAGIC = b"SFPK"
+_VERSION = 1
+
+
+def _source_identity(path):
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def peak_file_path(source_path):
+    """
+    Peak files live in a hidden folder next to the audio file, so every
+    speaker referencing the same asset shares them. The name encodes the
+    asset name and its size/mtime; an edited asset gets a new file.
+    """
+    source_path = os.path.abspath(source_path)
+    size, mtime_ns = _source_identity(source_path)
+    name_key = hashlib.sha1(os.path.basename(source_path).encode("utf-8")).hexdigest()[:16]
+    identity_key = hashlib.sha1(f"{size}:{mtime_ns}".encode()).hexdigest()[:16]
+    folder = os.path.join(os.path.dirname(source_path), PEAK_DIR)
+    return os.path.join(folder, f"{name_key}.{identity_key}{PEAK_EXT}")
+
+
+def save_peaks(pyramid: PeakPyramid, source_path):
+    peak_path = peak_file_path(source_path)
+    folder = os.path.dirname(peak_path)
+    os.makedirs(folder, exist_ok=True)
+
+    size, mtime_ns = _source_identity(source_path)
+    mins, maxs = pyramid.levels[0]
+    header = _HEADER.pack(_MAGIC, _VERSION, BASE_BLOCK, pyramid.source.frame_count, size, mtime_ns, len(mins))
+
+    # Only a cache: skip the fsync, a torn file is just rebuilt
+    with atomic_write(peak_path, fsync=False) as f:
+        f.write(header)
+        f.write(to_pcm16(mins).tobytes())
+        f.write(to_pcm16(maxs).tobytes())
+
+    # Drop peak files of older versions of the same asset
+    name_key = os.path.basename(peak_path).split(".")[0]
+    for entry in os.listdir(folder):
+        if entry.startswith(name_key + ".") and entry.endswith(PEAK_EXT) and entry != os.path.basename(peak_path):
+            try:
+                os.remove(os.path.join(folder, entry))
+            except OSError:
+                pass
+
+    prune_peak_cache(folder)
+
+
+def load_peaks(source: AudioSource, source_path):
+    """Return a PeakPyramid from disk, or None if there is no valid entry for the current file."""
+    peak_path = peak_file_path(source_path)
+    if not os.path.exists(peak_path):
+        return None
+
+    size, mtime_ns = _source_identity(source_path)
+    with open(peak_path, "rb") as f:
+        data = f.read()
+    if len(data) < _HEADER.size:
+        return None
+
+    magic, version, base_block, frame_count, cached_size, cached_mtime, count = _HEADER.unpack_from(data)
+    if (magic != _MAGIC or version != _VERSION or base_block != BASE_BLOCK
+            or frame_count != source.frame_count or (cached_size, cached_mtime) != (size, mtime_ns)
+            or len(data) != _HEADER.size + 4 * count):
+        return None
+
+    values = np.frombuffer(data, dtype="<i2", offset=_HEADER.size).astype(np.float32) / 32767.0
+    # Mark as recently used for the size cap
+    os.utime(peak_path)
+    return PeakPyramid(source, values[:count], values[count:])
+
+
+def prune_peak_cache(folder, max_bytes=MAX_CACHE_BYTES):
+    """Delete least recently used peak files until the folder is under max_bytes."""
+    entries = []
+    for entry in os.listdir(folder):
+        if entry.endswith(PEAK_EXT):
+            path = os.path.join(folder, entry)
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+
+def cached_peak_pyramid(source: AudioSource) -> PeakPyramid:
+    """
+    Return the peak pyramid for a source, building it only when neither the
+    in-memory nor the on-disk cache has a current copy.
+    """
+    if source.peak_pyramid is not None:
+        return source.peak_pyramid
+
+    pyramid = None
+    if source.path:
+        try:
+            pyramid = load_peaks(source, source.path)
+        except (OSError, struct.error) as e:
+            print(f"[INFO] Ignoring unreadable peak file for {source.path}: {e}")
+
+    if pyramid is None:
+        pyramid = PeakPyramid(source)
+        if source.path:
+            try:
+                save_peaks(pyramid, source.path)
+            except OSError as e:
+                print(f"[INFO] Could not write peak file for {source.path}: {e}")
+
+    source.peak_pyramid = pyramid
+    return pyramid
@@ -0,0 +1,65 @@
+#storage\render_manifest.py
+import hashlib
+import json
+import os
+
+from storage.atomic_file import atomic_write
+
+MANIFEST_NAME = "compiled.manifest.json"
+COMPILED_NAME = "compiled.wav"
+MANIFEST_VERSION = 1
+
+
+def _file_identity(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def timeline_fingerprint(timeline) -> str:
+    """
+    Hash of everything that determines the mix: clip placement and trims
+    plus the identity (path, size, mtime) of every referenced asset.
+    Only stats files, so it is cheap enough to run on every open.
+    """
+    graph = []
+    for track in timeline.tracks:
+        clips = []
+        for clip in track.clips:
+            path = os.path.abspath(clip.source_path or clip.file_path)
+            clips.append([path, _file_identity(path), clip.start_time, clip.trim_start, clip.trim_end])
+        graph.append(clips)
+    payload = json.dumps({"version": MANIFEST_VERSION, "tracks": graph}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def read_manifest(speaker_path):
+    try:
+        with open(os.path.join(speaker_path, MANIFEST_NAME), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def is_compiled_current(speaker_path, fingerprint) -> bool:
+    """True if compiled.wav was rendered from this exact fingerprint and not touched since."""
+    manifest = read_manifest(speaker_path)
+    if not manifest or manifest.get("version") != MANIFEST_VERSION:
+        return False
+    compiled = _file_identity(os.path.join(speaker_path, COMPILED_NAME))
+    return manifest.get("fingerprint") == fingerprint and compiled is not None and manifest.get("compiled") == compiled
+
+
+def write_manifest(speaker_path, fingerprint, duration=None):
+    """Record the fingerprint compiled.wav was just rendered from."""
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "fingerprint": fingerprint,
+        "compiled": _file_identity(os.path.join(speaker_path, COMPILED_NAME)),
+        "duration": duration,
+    }
+    path = os.path.join(speaker_path, MANIFEST_NAME)
+    with atomic_write(path, "w") as f:
+        json.dump(manifest, f, indent=2)
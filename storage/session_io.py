@@ -4,6 +4,31 @@ import json
 from core.timeline import Timeline
 from core.track import Track
 from core.audio_clip import AudioClip
+from core.audio_source import AudioInfo, open_source
+from storage.asset_store import AssetStore
+
+
+def source_row(source, path):
+    """(size, mtime_ns) of path followed by the source's stream info, or None."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_size, stat.st_mtime_ns) + tuple(source.info)
+
+
+def known_source_info(file_path, row):
+    # Stored stream info is only trusted while the file is unchanged
+    if not row:
+        return None
+    size, mtime_ns = row[:2]
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    if (stat.st_size, stat.st_mtime_ns) != (size, mtime_ns):
+        return None
+    return AudioInfo(*row[2:])
 
 
 def save_session_to_file(timeline: Timeline, speaker_path: str):
@@ -11,9 +36,7 @@ def save_session_to_file(timeline: Timeline, speaker_path: str):
         "tracks": []
     }
 
-    sync_root = os.path.abspath(os.path.join(speaker_path, os.pardir, os.pardir))
-    asset_folder = os.path.join(sync_root, "assets")
-    os.makedirs(asset_folder, exist_ok=True)
+    store = AssetStore.for_speaker(speaker_path)
 
     for track in timeline.tracks:
         track_data = {"clips": []}
@@ -22,16 +45,13 @@ def save_session_to_file(timeline: Timeline, speaker_path: str):
             if not source_path:
                 continue
             source_path = os.path.abspath(source_path)
-            filename = os.path.basename(source_path)
-            asset_path = os.path.join(asset_folder, filename)
 
-            # Copy audio file if not already in assets
-            if not os.path.exists(asset_path):
-                try:
-                    with open(source_path, 'rb') as src_file, open(asset_path, 'wb') as dst_file:
-                        dst_file.write(src_file.read())
-                except Exception as e:
-                    print(f"[ERROR] Failed to copy asset: {e}")
+            # Clips dropped in the editor already point into the store
+            try:
+                asset_path = store.import_file(source_path)
+            except Exception as e:
+                print(f"[ERROR] Failed to copy asset: {e}")
+                asset_path = source_path
 
             rel_path = os.path.relpath(asset_path, speaker_path)
 
@@ -41,6 +61,10 @@ def save_session_to_file(timeline: Timeline, speaker_path: str):
                 "trim_start": clip.trim_start,
                 "trim_end": clip.trim_end
             }
+            # Lets loading skip decoding compressed files to learn their length
+            row = source_row(clip.source, asset_path)
+            if row is not None:
+                clip_data["source"] = list(row)
             track_data["clips"].append(clip_data)
         session_data["tracks"].append(track_data)
 
@@ -65,11 +89,13 @@ def load_session_from_file(session_path: str) -> Timeline:
             try:
                 file_path = os.path.join(os.path.dirname(session_path), clip_data["file"])
                 file_path = os.path.abspath(file_path)
+                source = open_source(file_path, info=known_source_info(file_path, clip_data.get("source")))
                 clip = AudioClip(
                     file_path,
                     start_time=clip_data.get("start_time", 0.0),
                     trim_start=clip_data.get("trim_start", 0.0),
-                    trim_end=clip_data.get("trim_end", None)
+                    trim_end=clip_data.get("trim_end", None),
+                    source=source
                 )
                 clip.source_path = file_path
                 track.add_clip(clip)
@@ -0,0 +1,193 @@
+#storage\session_store.py
+import os
+import sqlite3
+
+from core.audio_source import open_source
+from core.timeline import Timeline
+from core.track import Track
+from core.audio_clip import AudioClip
+from storage.asset_store import AssetStore
+from storage.session_io import known_source_info, load_session_from_file, save_session_to_file
+
+SESSION_DB = "session.db"
+SESSION_JSON = "session.json"
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS clips (
+    track INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    file TEXT NOT NULL,
+    start_time REAL NOT NULL,
+    trim_start REAL NOT NULL,
+    trim_end REAL NOT NULL,
+    PRIMARY KEY (track, position)
+);
+CREATE TABLE IF NOT EXISTS sources (
+    file TEXT PRIMARY KEY,
+    size INTEGER,
+    mtime_ns INTEGER,
+    frame_rate INTEGER,
+    channels INTEGER,
+    sample_width INTEGER,
+    frame_count INTEGER
+);
+"""
+
+
+class SessionStore:
+    """
+    SQLite session backend kept next to session.json as session.db.
+    save() diffs the timeline against what was last written and only
+    touches the rows of clips that changed, so frequent saves of large
+    sessions stay cheap. Stream info of every source is stored as well,
+    so loading never has to decode compressed audio to learn its length.
+    """
+
+    def __init__(self, speaker_path):
+        self.speaker_path = os.path.abspath(speaker_path)
+        self.path = os.path.join(self.speaker_path, SESSION_DB)
+        self._conn = None
+        self._saved = None    # (track, position) -> row as last written
+        self._sources = None  # file -> identity as last written
+
+    def _connect(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _read_state(self, conn):
+        if self._saved is None:
+            self._saved = {
+                (row[0], row[1]): row[2:]
+                for row in conn.execute(
+                    "SELECT track, position, file, start_time, trim_start, trim_end FROM clips")
+            }
+            self._sources = {
+                row[0]: row[1:] for row in conn.execute("SELECT file, size, mtime_ns FROM sources")
+            }
+
+    def save(self, timeline: Timeline) -> int:
+        """Write the clips that changed since the last save; returns how many rows changed."""
+        conn = self._connect()
+        self._read_state(conn)
+        store = AssetStore.for_speaker(self.speaker_path)
+
+        rows = {}
+        sources = {}
+        for t, track in enumerate(timeline.tracks):
+            for p, clip in enumerate(track.clips):
+                source_path = os.path.abspath(clip.source_path or clip.file_path)
+                asset_path = store.import_file(source_path)
+                file = os.path.relpath(asset_path, self.speaker_path).replace('\\', '/')
+                rows[(t, p)] = (file, clip.start_time, clip.trim_start, clip.trim_end)
+                sources[file] = clip.source
+
+        removed = [key for key in self._saved if key not in rows]
+        changed = [(key, row) for key, row in rows.items() if self._saved.get(key) != row]
+
+        source_rows = []
+        for file, source in sources.items():
+            try:
+                stat = os.stat(source.path)
+            except OSError:
+                continue
+            identity = (stat.st_size, stat.st_mtime_ns)
+            if self._sources.get(file) != identity:
+                source_rows.append((file,) + identity + tuple(source.info))
+                self._sources[file] = identity
+
+        with conn:
+            conn.executemany("DELETE FROM clips WHERE track = ? AND position = ?", removed)
+            conn.executemany("INSERT OR REPLACE INTO clips VALUES (?, ?, ?, ?, ?, ?)",
+                             [key + row for key, row in changed])
+            conn.executemany("INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?, ?, ?, ?)", source_rows)
+            conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                             [("version", str(SCHEMA_VERSION)),
+                              ("name", timeline.name),
+                              ("track_count", str(len(timeline.tracks)))])
+        self._saved = rows
+        return len(removed) + len(changed)
+
+    def load(self) -> Timeline:
+        """Rebuild the timeline from session.db. Only WAV headers are read."""
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"Session database not found: {self.path}")
+        conn = self._connect()
+        meta = dict(conn.execute("SELECT key, value FROM meta"))
+        if meta.get("version") != str(SCHEMA_VERSION):
+            raise ValueError(f"Unsupported session database version {meta.get('version')} in {self.path}")
+
+        known = {row[0]: row[1:] for row in conn.execute("SELECT * FROM sources")}
+        timeline = Timeline(meta.get("name") or os.path.basename(self.speaker_path))
+        for _ in range(int(meta.get("track_count", 0))):
+            timeline.add_track(Track())
+
+        rows = conn.execute(
+            "SELECT track, position, file, start_time, trim_start, trim_end FROM clips ORDER BY track, position")
+        for track_index, _, file, start_time, trim_start, trim_end in rows:
+            if track_index >= len(timeline.tracks):
+                raise ValueError(f"Clip on missing track {track_index} in {self.path}")
+            file_path = os.path.abspath(os.path.join(self.speaker_path, file))
+            try:
+                source = open_source(file_path, info=known_source_info(file_path, known.get(file)))
+                clip = AudioClip(file_path, start_time=start_time, trim_start=trim_start, trim_end=trim_end,
+                                 source=source)
+                clip.source_path = file_path
+                timeline.tracks[track_index].add_clip(clip)
+            except Exception as e:
+                print(f"[ERROR] Failed to load clip {file}: {e}")
+
+        self._saved = None
+        self._read_state(conn)
+        return timeline
+
+
+def _last_write(path):
+    # With WAL, committed writes may still sit in the -wal file
+    times = [os.path.getmtime(p) for p in (path, path + "-wal") if os.path.exists(p)]
+    return max(times) if times else None
+
+
+def load_speaker_session(speaker_path, store: SessionStore = None) -> Timeline:
+    """
+    Load a speaker from whichever of session.db and session.json was
+    written last, so a session.json edited or imported by hand still wins.
+    """
+    owned = store is None
+    store = store or SessionStore(speaker_path)
+    json_path = os.path.join(speaker_path, SESSION_JSON)
+    db_time = _last_write(store.path)
+    json_time = _last_write(json_path)
+    try:
+        if db_time is not None and (json_time is None or db_time >= json_time):
+            try:
+                return store.load()
+            except (sqlite3.Error, ValueError) as e:
+                print(f"[ERROR] Falling back to {SESSION_JSON}: {e}")
+        return load_session_from_file(json_path)
+    finally:
+        if owned:
+            store.close()
+
+
+def has_session(speaker_path) -> bool:
+    return any(os.path.exists(os.path.join(speaker_path, name)) for name in (SESSION_DB, SESSION_JSON))
+
+
+def export_session_json(timeline: Timeline, speaker_path, store: SessionStore = None):
+    """Write session.json for tools that read JSON, then save to the session store."""
+    store = store or SessionStore(speaker_path)
+    # The database is written last so it stays the newer of the two and
+    # load_speaker_session keeps using it
+    save_session_to_file(timeline, speaker_path)
+    store.save(timeline)
@@ -0,0 +1,310 @@
+#storage\sync_watcher.py
+import ctypes
+import ctypes.util
+import os
+import queue
+import select
+import struct
+import sys
+import threading
+import time
+
+from storage.export import export_all_speakers
+from storage.ipc import SyncServer
+from storage.render_manifest import COMPILED_NAME, read_manifest
+
+REQUEST_FILE = "export_request.json"
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+_EVENT = struct.Struct("iIII")
+
+
+def _speakers_dir(sync_path):
+    return os.path.join(sync_path, "speakers")
+
+
+def _request_path(sync_path, name):
+    return os.path.join(_speakers_dir(sync_path), name, REQUEST_FILE)
+
+
+def _scan_requests(sync_path):
+    """Return {speaker name: request mtime} for every pending export request."""
+    requests = {}
+    speakers_dir = _speakers_dir(sync_path)
+    if not os.path.isdir(speakers_dir):
+        return requests
+    for name in os.listdir(speakers_dir):
+        try:
+            requests[name] = os.stat(_request_path(sync_path, name)).st_mtime_ns
+        except OSError:
+            pass
+    return requests
+
+
+class PollingBackend:
+    """Portable fallback: compares request file mtimes on every poll."""
+
+    def __init__(self, sync_path, interval=1.0):
+        self.sync_path = sync_path
+        self.interval = interval
+        self._seen = {}
+
+    def wait(self, timeout):
+        time.sleep(min(timeout, self.interval))
+        current = _scan_requests(self.sync_path)
+        changed = {name for name, mtime in current.items() if self._seen.get(name) != mtime}
+        self._seen = current
+        return changed
+
+    def close(self):
+        pass
+
+
+class InotifyBackend:
+    """Linux inotify on speakers/ and each speaker folder, through libc via ctypes."""
+
+    def __init__(self, sync_path):
+        self.sync_path = sync_path
+        libc_name = ctypes.util.find_library("c")
+        if not sys.platform.startswith("linux") or not libc_name:
+            raise OSError("inotify is not available on this platform")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs = {}  # watch descriptor -> speaker name, None for speakers/
+
+        speakers_dir = _speakers_dir(sync_path)
+        if not os.path.isdir(speakers_dir):
+            os.close(self.fd)
+            raise OSError(f"{speakers_dir} does not exist")
+        self._watch(speakers_dir, None, IN_CREATE | IN_MOVED_TO)
+        for name in os.listdir(speakers_dir):
+            if os.path.isdir(os.path.join(speakers_dir, name)):
+                self._watch_speaker(name)
+
+    def _watch(self, path, name, mask):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {path}")
+        self._dirs[wd] = name
+
+    def _watch_speaker(self, name):
+        path = os.path.join(_speakers_dir(self.sync_path), name)
+        try:
+            self._watch(path, name, IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE)
+        except OSError as e:
+            print(f"[INFO] Not watching {path}: {e}")
+
+    def wait(self, timeout):
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed = set()
+        offset = 0
+        while offset + _EVENT.size <= len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            name = data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b"\0")
+            name = os.fsdecode(name)
+            offset += _EVENT.size + length
+
+            if mask & IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            speaker = self._dirs.get(wd)
+            if speaker is None and mask & IN_ISDIR:
+                # New speaker folder; the request may already be inside it
+                self._watch_speaker(name)
+                changed.add(name)
+            elif speaker is not None and name == REQUEST_FILE:
+                changed.add(speaker)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class SyncFolderWatcher:
+    """
+    Calls on_requests(names) on a background thread with the speakers that
+    have a pending export_request.json. Bursts of writes are debounced so a
+    speaker is reported once per burst. Requests already present when the
+    watcher starts are reported too.
+    """
+
+    def __init__(self, sync_path, on_requests, debounce=0.5, poll_interval=1.0):
+        self.sync_path = sync_path
+        self.on_requests = on_requests
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _make_backend(self):
+        try:
+            return InotifyBackend(self.sync_path)
+        except OSError as e:
+            print(f"[INFO] Polling sync folder instead of inotify: {e}")
+            return PollingBackend(self.sync_path, self.poll_interval)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        backend = self._make_backend()
+        pending = set(_scan_requests(self.sync_path))
+        last_event = time.monotonic()
+        try:
+            while not self._stop.is_set():
+                changed = backend.wait(self.debounce / 2 if pending else 0.5)
+                if changed:
+                    pending |= changed
+                    last_event = time.monotonic()
+                if pending and time.monotonic() - last_event >= self.debounce:
+                    ready = sorted(name for name in pending
+                                   if os.path.exists(_request_path(self.sync_path, name)))
+                    pending.clear()
+                    if ready:
+                        self.on_requests(ready)
+        finally:
+            backend.close()
+
+
+class ExportRequestService:
+    """
+    Services export requests: the watcher queues speakers with an
+    export_request.json, and with ipc enabled peers can also ask over the
+    storage.ipc channel. A worker thread mixes them (in a process pool)
+    into compiled.wav, removes each request file it fulfilled and pushes a
+    compiled_ready message to connected peers.
+    """
+
+    def __init__(self, sync_path, workers=None, on_exported=None, ipc=True, **watcher_options):
+        self.sync_path = sync_path
+        self.workers = workers
+        self.on_exported = on_exported
+        self._queue = queue.Queue()
+        self._ipc_requests = set()
+        self._ipc_lock = threading.Lock()
+        self._watcher = SyncFolderWatcher(sync_path, self._enqueue, **watcher_options)
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._server = SyncServer(sync_path, self._on_ipc_message) if ipc else None
+
+    def start(self):
+        self._worker.start()
+        self._watcher.start()
+        if self._server is not None:
+            try:
+                self._server.start()
+            except OSError as e:
+                print(f"[INFO] No IPC channel, using request files only: {e}")
+                self._server = None
+
+    def stop(self):
+        if self._server is not None:
+            self._server.stop()
+        self._watcher.stop()
+        self._queue.put(None)
+        self._worker.join()
+
+    def _on_ipc_message(self, message):
+        if message.get("type") != "export_request":
+            return
+        name = message.get("speaker")
+        if not isinstance(name, str) or name in ("", ".", "..") or os.path.basename(name) != name:
+            return
+        if not os.path.isdir(os.path.join(_speakers_dir(self.sync_path), name)):
+            return
+        with self._ipc_lock:
+            self._ipc_requests.add(name)
+        self._enqueue([name])
+
+    def notify_compiled(self, speaker_path):
+        """Tell connected peers that a speaker's compiled.wav was (re)written."""
+        if self._server is None:
+            return
+        manifest = read_manifest(speaker_path) or {}
+        self._server.broadcast({
+            "type": "compiled_ready",
+            "speaker": os.path.basename(os.path.normpath(speaker_path)),
+            "path": os.path.join(speaker_path, COMPILED_NAME),
+            "fingerprint": manifest.get("fingerprint"),
+            "duration": manifest.get("duration"),
+        })
+
+    def _enqueue(self, names):
+        for name in names:
+            self._queue.put(name)
+
+    def _run(self):
+        while True:
+            name = self._queue.get()
+            if name is None:
+                return
+            # Drain whatever else queued up meanwhile into one batch
+            names = {name}
+            while True:
+                try:
+                    more = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if more is None:
+                    self._queue.put(None)
+                    break
+                names.add(more)
+            self._export(sorted(names))
+
+    def _export(self, names):
+        requested = {}
+        with self._ipc_lock:
+            for name in names:
+                if name in self._ipc_requests:
+                    self._ipc_requests.discard(name)
+                    requested[name] = None
+        for name in names:
+            try:
+                requested[name] = os.stat(_request_path(self.sync_path, name)).st_mtime_ns
+            except OSError:
+                pass
+        if not requested:
+            return
+
+        print(f"[SYNC] Export requested for: {', '.join(requested)}")
+        speakers_dir = _speakers_dir(self.sync_path)
+        try:
+            results = export_all_speakers(self.sync_path, workers=self.workers,
+                                          speaker_paths=[os.path.join(speakers_dir, n) for n in requested])
+        except Exception as e:
+            print(f"[ERROR] Export request failed: {e}")
+            return
+
+        for result in results:
+            if result["error"]:
+                continue
+            name = result["name"]
+            request = _request_path(self.sync_path, name)
+            try:
+                # A request rewritten while we were mixing stays for the next round
+                if requested[name] is not None and os.stat(request).st_mtime_ns == requested[name]:
+                    os.remove(request)
+            except OSError:
+                pass
+            self.notify_compiled(result["path"])
+        if self.on_exported:
+            self.on_exported(results)
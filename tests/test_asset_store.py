@@ -0,0 +1,34 @@
+#tests\test_asset_store.py
+import os
+
+from storage.asset_store import AssetStore, import_in_background
+
+
+def make_file(path, size=3 * 1024 * 1024):
+    with open(path, "wb") as f:
+        f.write(os.urandom(size))
+    return str(path)
+
+
+def test_concurrent_imports_of_one_file(tmp_path):
+    for attempt in range(6):
+        original = make_file(tmp_path / f"take{attempt}.wav")
+        store = AssetStore(str(tmp_path / "sync"))
+        futures = [import_in_background(store, original) for _ in range(2)]
+        paths = {future.result() for future in futures}
+
+        assert len(paths) == 1
+        asset_path = paths.pop()
+        with open(original, "rb") as a, open(asset_path, "rb") as b:
+            assert a.read() == b.read()
+    assert all(not name.endswith(".tmp") for name in os.listdir(store.asset_dir))
+
+
+def test_asset_does_not_share_the_original_inode(tmp_path):
+    original = make_file(tmp_path / "voice.wav", size=4096)
+    asset_path = AssetStore(str(tmp_path / "sync")).import_file(original)
+
+    with open(original, "r+b") as f:
+        f.write(b"edited in place")
+    with open(asset_path, "rb") as f:
+        assert not f.read().startswith(b"edited in place")
@@ -0,0 +1,47 @@
+#tests\test_atomic_file.py
+import os
+import threading
+
+import pytest
+
+from storage.atomic_file import atomic_write
+
+
+def test_concurrent_writers_never_share_a_temp_file(tmp_path):
+    path = str(tmp_path / "compiled.wav")
+    errors = []
+
+    def writer(byte):
+        try:
+            for _ in range(50):
+                with atomic_write(path, fsync=False) as f:
+                    for _ in range(64):
+                        f.write(byte * 1024)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(bytes([i]),)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    with open(path, "rb") as f:
+        data = f.read()
+    # Always one writer's complete file, never a mix of two
+    assert len(data) == 64 * 1024 and len(set(data)) == 1
+    assert os.listdir(tmp_path) == ["compiled.wav"]
+
+
+def test_failed_write_leaves_the_old_file(tmp_path):
+    path = str(tmp_path / "manifest.json")
+    with atomic_write(path, "w") as f:
+        f.write("old")
+    with pytest.raises(RuntimeError):
+        with atomic_write(path, "w") as f:
+            f.write("new")
+            raise RuntimeError("interrupted")
+    with open(path) as f:
+        assert f.read() == "old"
+    assert os.listdir(tmp_path) == ["manifest.json"]
@@ -0,0 +1,80 @@
+#tests\test_ipc.py
+import json
+import socket
+
+import pytest
+
+from storage.ipc import IPC_FILE, LineReader, SyncServer, encode, read_endpoint
+
+
+class Peer:
+    """Stand-in for the Blender add-on: a blocking JSON-lines client."""
+
+    def __init__(self, port):
+        self.sock = socket.create_connection(("127.0.0.1", port), timeout=5)
+        self.reader = LineReader()
+        self.pending = []
+
+    def send(self, message):
+        self.sock.sendall(encode(message))
+
+    def receive(self):
+        while not self.pending:
+            data = self.sock.recv(4096)
+            if not data:
+                return None
+            self.pending.extend(self.reader.feed(data))
+        return self.pending.pop(0)
+
+    def close(self):
+        self.sock.close()
+
+
+@pytest.fixture
+def server(tmp_path):
+    def on_message(message):
+        # Stands in for the export service: answer every request at once
+        if message.get("type") == "export_request":
+            server.broadcast({"type": "compiled_ready", "speaker": message["speaker"],
+                              "fingerprint": "abc", "duration": 1.5})
+
+    server = SyncServer(str(tmp_path), on_message)
+    server.start()
+    yield server
+    server.stop()
+
+
+def test_server_advertises_its_endpoint(server, tmp_path):
+    with open(tmp_path / IPC_FILE) as f:
+        info = json.load(f)
+    assert read_endpoint(str(tmp_path)) == (info["port"], server.token)
+
+
+def test_hello_export_request_compiled_ready(server, tmp_path):
+    port, token = read_endpoint(str(tmp_path))
+    peer = Peer(port)
+    try:
+        peer.send({"type": "hello", "token": token, "peer": "blender"})
+        assert peer.receive()["type"] == "welcome"
+        peer.send({"type": "export_request", "speaker": "Alpha"})
+        assert peer.receive() == {"type": "compiled_ready", "speaker": "Alpha",
+                                  "fingerprint": "abc", "duration": 1.5}
+    finally:
+        peer.close()
+
+
+def test_peer_without_the_token_is_dropped(server, tmp_path):
+    port, _ = read_endpoint(str(tmp_path))
+    peer = Peer(port)
+    try:
+        peer.send({"type": "hello", "token": "stale"})
+        assert peer.receive() is None
+    finally:
+        peer.close()
+
+
+def test_stop_withdraws_the_endpoint(tmp_path):
+    server = SyncServer(str(tmp_path), lambda message: None)
+    server.start()
+    server.stop()
+    assert read_endpoint(str(tmp_path)) is None
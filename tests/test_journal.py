@@ -0,0 +1,43 @@
+#tests\test_journal.py
+import numpy as np
+
+from core.audio_clip import AudioClip
+from core.audio_source import array_to_segment
+from core.history import SetPlacement
+from core.timeline import Timeline
+from core.track import Track
+from storage.journal import EditJournal, replay_journal
+
+RATE = 8000
+
+
+def make_wav(path):
+    frames = np.zeros((4 * RATE, 1), dtype=np.float32)
+    array_to_segment(frames, RATE).export(str(path), format="wav")
+
+
+def make_timeline(path):
+    timeline = Timeline("Speaker")
+    timeline.add_track(Track())
+    timeline.tracks[0].add_clip(AudioClip(str(path)))
+    return timeline
+
+
+def test_one_record_per_placement_edit(tmp_path):
+    make_wav(tmp_path / "take.wav")
+    timeline = make_timeline(tmp_path / "take.wav")
+    clip = timeline.tracks[0].clips[0]
+    journal = EditJournal(str(tmp_path), fsync_interval=0.01)
+    journal.attach(timeline)
+    for step in range(1, 11):
+        SetPlacement(clip, start_time=step * 0.5, trim_start=0.25, trim_end=3.0).do()
+    journal.flush()
+    journal.close()
+
+    with open(journal.path) as f:
+        lines = f.read().splitlines()
+    assert len(lines) == 1 + 10  # the base record, then one per edit
+
+    replayed = make_timeline(tmp_path / "take.wav")
+    assert replay_journal(str(tmp_path), replayed) == 10
+    assert replayed.tracks[0].clips[0].placement == clip.placement
@@ -0,0 +1,66 @@
+#tests\test_mixer.py
+import numpy as np
+
+from core.audio_source import SegmentSource, array_to_segment
+from core.mixer import LIMITER_MARGIN, MixCache, Mixer
+
+RATE = 8000
+
+
+def tone(seconds, level, freq=220.0, channels=2):
+    t = np.arange(int(seconds * RATE)) / float(RATE)
+    wave = (level * np.sin(2 * np.pi * freq * t)).astype(np.float32)
+    return SegmentSource(array_to_segment(np.repeat(wave[:, None], channels, axis=1), RATE))
+
+
+def overlapping_mix():
+    # Two near full scale tones that overlap only in the second half
+    mixer = Mixer()
+    mixer.add_source(tone(2.0, 0.95), 0.0)
+    mixer.add_source(tone(1.0, 0.9, freq=330.0), 1.0)
+    return mixer
+
+
+def render_in_blocks(source, block_frames):
+    return np.concatenate([
+        source.render(start, min(block_frames, source.frame_count - start))
+        for start in range(0, source.frame_count, block_frames)
+    ])
+
+
+def test_limited_render_does_not_depend_on_block_split():
+    mixer = overlapping_mix()
+    full = mixer.render(0, mixer.frame_count)
+    for block_frames in (1000, 2048, 4097):
+        assert np.array_equal(render_in_blocks(mixer, block_frames), full)
+
+
+def test_limiter_keeps_full_scale_and_leaves_clean_audio_alone():
+    mixer = overlapping_mix()
+    limited = mixer.render(0, mixer.frame_count)
+    unlimited = mixer.render(0, mixer.frame_count, limit=False)
+    assert np.abs(unlimited).max() > 1.0
+    assert np.abs(limited).max() <= 1.0
+    # The first second never overloads and is far from the overlap
+    clean = RATE - LIMITER_MARGIN
+    assert np.array_equal(limited[:clean], unlimited[:clean])
+
+
+def test_mix_within_full_scale_is_untouched():
+    mixer = Mixer()
+    mixer.add_source(tone(1.0, 0.99), 0.0)
+    assert np.array_equal(mixer.render(0, mixer.frame_count),
+                          mixer.render(0, mixer.frame_count, limit=False))
+
+
+def test_mix_cache_renders_like_the_mixer():
+    mixer = overlapping_mix()
+
+    class Snapshot:
+        tracks = ()
+
+    cache = MixCache(Snapshot())
+    cache.bus = mixer.render(0, mixer.frame_count, limit=False)
+    cache.format = mixer.output_format()
+    cache.frame_count = mixer.frame_count
+    assert np.array_equal(render_in_blocks(cache, 2048), mixer.render(0, mixer.frame_count))
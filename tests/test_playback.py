@@ -0,0 +1,50 @@
+#tests\test_playback.py
+import threading
+import wave
+
+import numpy as np
+
+from core.audio_source import SegmentSource, array_to_segment, to_pcm16
+from core.mixer import Mixer
+from core.playback import PlaybackEngine, WavFileSink
+
+RATE = 8000
+
+
+def mixer():
+    t = np.arange(3 * RATE) / float(RATE)
+    left = 0.6 * np.sin(2 * np.pi * 220.0 * t)
+    right = 0.6 * np.sin(2 * np.pi * 330.0 * t)
+    source = SegmentSource(array_to_segment(np.stack([left, right], axis=1).astype(np.float32), RATE))
+    mix = Mixer()
+    mix.add_source(source, 0.0)
+    mix.add_source(source, 1.5, first_frame=RATE // 2)  # overlaps, so the limiter is involved
+    return mix
+
+
+def play_to_file(source, path, start_frame=0):
+    finished = threading.Event()
+    engine = PlaybackEngine(sink=WavFileSink(str(path)), block_frames=1000)
+    engine.on_finished = finished.set
+    engine.start(source, start_frame)
+    assert finished.wait(10)
+    engine.stop()
+    with wave.open(str(path), "rb") as wav:
+        assert (wav.getframerate(), wav.getnchannels(), wav.getsampwidth()) == (RATE, 2, 2)
+        played = np.frombuffer(wav.readframes(wav.getnframes()), dtype="<i2").reshape((-1, 2))
+    return engine, played
+
+
+def test_engine_plays_the_whole_mix(tmp_path):
+    mix = mixer()
+    engine, played = play_to_file(mix, tmp_path / "out.wav")
+    assert np.array_equal(played, to_pcm16(mix.mix()))
+    assert engine.position_frames == mix.frame_count
+
+
+def test_engine_starts_from_an_offset(tmp_path):
+    mix = mixer()
+    start = RATE + 123
+    engine, played = play_to_file(mix, tmp_path / "out.wav", start_frame=start)
+    assert np.array_equal(played, to_pcm16(mix.mix())[start:])
+    assert engine.position_frames == mix.frame_count
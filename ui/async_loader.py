@@ -0,0 +1,59 @@
+#ui\async_loader.py
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from storage.peak_cache import cached_peak_pyramid
+
+
+class PeakLoader(QObject):
+    """
+    Builds peak pyramids on worker threads. `ready` is emitted with the
+    source once its pyramid is available; Qt delivers it on the GUI thread.
+    """
+    ready = pyqtSignal(object)
+
+    def __init__(self, workers=2):
+        super().__init__()
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self._pending = set()
+
+    def request(self, source):
+        """Return True if the pyramid is already loaded, otherwise start loading it."""
+        if source.peak_pyramid is not None:
+            return True
+        if id(source) not in self._pending:
+            self._pending.add(id(source))
+            future = self.pool.submit(cached_peak_pyramid, source)
+            future.add_done_callback(lambda f, source=source: self._finished(f, source))
+        # A fast load may already have finished (and emitted) above
+        return source.peak_pyramid is not None
+
+    def _finished(self, future, source):
+        # Usually runs on the worker thread, in which case the signal is queued
+        # to the GUI thread
+        self._pending.discard(id(source))
+        if future.exception() is not None:
+            print(f"[ERROR] Failed to build waveform for {source.path}: {future.exception()}")
+            return
+        self.ready.emit(source)
+
+
+_peak_loader = None
+
+
+def peak_loader() -> PeakLoader:
+    global _peak_loader
+    if _peak_loader is None:
+        _peak_loader = PeakLoader()
+    return _peak_loader
+
+
+def when_done(future, callback, interval=50):
+    """Call callback(future) on the GUI thread once the future has finished."""
+    def poll():
+        if future.done():
+            callback(future)
+        else:
+            QTimer.singleShot(interval, poll)
+    QTimer.singleShot(0, poll)
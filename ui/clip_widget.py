@@ -1,70 +1,148 @@
 #ui\clip_widget.py
 from PyQt6.QtWidgets import QWidget
-from PyQt6.QtGui import QPainter, QPen, QColor, QMouseEvent, QKeyEvent
+from PyQt6.QtGui import QPainter, QColor, QMouseEvent, QKeyEvent, QImage, QPixmap
 from PyQt6.QtCore import Qt
+from collections import OrderedDict
 import numpy as np
-from pydub import AudioSegment
+
+from core.audio_clip import AudioClip
+from core.history import SetPlacement
+from ui.async_loader import peak_loader
 
 class ClipWidget(QWidget):
     RESIZE_MARGIN = 10
+    TILE_WIDTH = 512  # px of waveform per cached pixmap
+    MAX_TILES = 32    # cached tiles per clip, least recently drawn dropped first
 
-    def __init__(self, audio_segment: AudioSegment, pixels_per_second=100, parent=None):
+    def __init__(self, clip: AudioClip, pixels_per_second=100, parent=None, history=None):
         super().__init__(parent)
-        self.original_audio = audio_segment
-        self.start_time_offset = 0.0
-        self.end_time_offset = 0.0
+        # Placement and trims live on the AudioClip; the widget only views them
+        # and edits them through the undo history when it has one
+        self.clip = clip
+        self.history = history
+        self.source = clip.source
         self.pixels_per_second = pixels_per_second
 
         self.selected = False
         self.selected_side = None  # 'left', 'right', or None
 
+        self._tiles = OrderedDict()  # tile index -> pixmap (or None when there is nothing to draw)
+        self._tiles_key = None
+
+        # Until the peaks arrive from the loader the clip draws as a placeholder
+        peak_loader().ready.connect(self.on_peaks_ready)
         self.update_audio_clip()
         self.setMinimumHeight(80)
 
         self.setFocusPolicy(Qt.FocusPolicy.ClickFocus)
 
+    @property
+    def start_time_offset(self):
+        return self.clip.trim_start
+
+    @start_time_offset.setter
+    def start_time_offset(self, value):
+        self.edit_placement(trim_start=value)
+
+    @property
+    def end_time_offset(self):
+        return self.source.duration - self.clip.trim_end
+
+    @end_time_offset.setter
+    def end_time_offset(self, value):
+        self.edit_placement(trim_end=self.source.duration - value)
+
+    def edit_placement(self, **placement):
+        command = SetPlacement(self.clip, **placement)
+        if self.history is not None:
+            self.history.execute(command)
+        else:
+            command.do()
 
     def update_audio_clip(self):
-        start_ms = int(self.start_time_offset * 1000)
-        end_ms = len(self.original_audio) - int(self.end_time_offset * 1000)
-        self.audio_clip = self.original_audio[start_ms:end_ms]
-        self.duration = len(self.audio_clip) / 1000.0
-        self.samples = self.extract_samples(self.audio_clip)
+        self.first_frame, self.last_frame = self.source.clamp(self.clip.first_frame, self.clip.last_frame)
+        self.duration = (self.last_frame - self.first_frame) / self.source.frame_rate
+        self.samples = self.extract_samples()
+        self._tiles_key = None
+        self.move(int(self.clip.start_time * self.pixels_per_second), self.y())
         self.setFixedWidth(int(self.duration * self.pixels_per_second))
         self.update()
 
-    def extract_samples(self, segment):
-        samples = np.array(segment.get_array_of_samples())
-        if segment.channels == 2:
-            samples = samples.reshape((-1, 2))
-            samples = samples.mean(axis=1)
-        downsample_factor = max(1, int(len(samples) / (self.duration * self.pixels_per_second)))
-        samples = samples[::downsample_factor]
-        samples = samples / np.max(np.abs(samples)) if samples.max() != 0 else samples
-        return samples
+    def on_peaks_ready(self, source):
+        if source is self.source:
+            self.update_audio_clip()
+
+    def extract_samples(self):
+        # Per-column min/max from the shared peak pyramid; the raw samples
+        # are not touched when trimming or zooming.
+        if not peak_loader().request(self.source):
+            empty = np.zeros(0, np.float32)
+            return empty, empty
+        pyramid = self.source.peak_pyramid
+        columns = int(self.duration * self.pixels_per_second)
+        mins, maxs = pyramid.peaks(self.first_frame, self.last_frame, columns)
+        if pyramid.peak != 0:
+            mins, maxs = mins / pyramid.peak, maxs / pyramid.peak
+        return mins, maxs
+
+    def render_waveform(self, x0, width, height):
+        """
+        Rasterise the min/max columns between x0 and x0 + width into a
+        transparent pixmap in one NumPy pass; repaints only blit it.
+        """
+        mins, maxs = self.samples
+        if width <= 0 or height <= 0 or len(mins) == 0:
+            return None
+
+        half = height // 2
+        xs = np.arange(x0, x0 + width)
+        columns = np.minimum(xs * len(mins) // max(1, self.width()), len(mins) - 1)
+        top = half - (maxs[columns] * half).astype(np.int32)
+        bottom = half - (mins[columns] * half).astype(np.int32)
+        rows = np.arange(height, dtype=np.int32)[:, None]
+        mask = (rows >= top[None, :]) & (rows <= bottom[None, :])
+
+        pixels = np.where(mask, np.uint32(0xFF000000), np.uint32(0)).astype(np.uint32)
+        image = QImage(pixels.data, width, height, width * 4, QImage.Format.Format_ARGB32)
+        return QPixmap.fromImage(image.copy())
 
     def paintEvent(self, event):
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
 
         if self.selected:
             painter.fillRect(self.rect(), QColor(200, 200, 255))  # Selected background
         else:
             painter.fillRect(self.rect(), QColor(220, 220, 220))
 
-        pen = QPen(Qt.GlobalColor.black)
-        painter.setPen(pen)
-
-        mid_y = self.height() // 2
-        width = self.width()
-        height = self.height()
-
-        if len(self.samples) > 0:
-            step = width / len(self.samples)
-            for i, sample in enumerate(self.samples):
-                x = int(i * step)
-                y = int(sample * (height // 2))
-                painter.drawLine(x, mid_y - y, x, mid_y + y)
+        # Long clips can be far wider than the viewport, so the waveform is
+        # rasterised in fixed tiles as they come into view. Scrolling only
+        # blits cached tiles; they are rebuilt when the trim, zoom or size
+        # changes.
+        visible = self.visibleRegion().boundingRect()
+        if visible.isEmpty():
+            visible = event.rect()
+        key = (self.first_frame, self.last_frame, self.width(), self.height())
+        if key != self._tiles_key:
+            self._tiles.clear()
+            self._tiles_key = key
+        first_tile = max(0, visible.left()) // self.TILE_WIDTH
+        last_tile = max(0, visible.right()) // self.TILE_WIDTH
+        drawn = False
+        for index in range(first_tile, last_tile + 1):
+            if index in self._tiles:
+                self._tiles.move_to_end(index)
+            else:
+                x0 = index * self.TILE_WIDTH
+                self._tiles[index] = self.render_waveform(x0, min(self.TILE_WIDTH, self.width() - x0), self.height())
+                if len(self._tiles) > self.MAX_TILES:
+                    self._tiles.popitem(last=False)
+            tile = self._tiles[index]
+            if tile is not None:
+                painter.drawPixmap(index * self.TILE_WIDTH, 0, tile)
+                drawn = True
+        if not drawn and self.source.peak_pyramid is None:
+            painter.setPen(QColor(120, 120, 120))
+            painter.drawText(visible, Qt.AlignmentFlag.AlignCenter, "Loading...")
 
         # Draw left and right handles
         if self.selected_side == 'left':
@@ -128,6 +206,6 @@ class ClipWidget(QWidget):
         return {
             "start_time_offset": round(self.start_time_offset, 2),
             "end_time_offset": round(self.end_time_offset, 2),
-            "position_sec": round(self.x() / self.pixels_per_second, 2),
+            "position_sec": round(self.clip.start_time, 2),
             "duration_sec": round(self.duration, 2)
         }
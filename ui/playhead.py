@@ -4,18 +4,26 @@ from PyQt6.QtGui import QPainter, QPen
 from PyQt6.QtCore import Qt
 
 class Playhead(QWidget):
+    WIDTH = 2
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.x_pos = 0
         self.setMinimumHeight(1000)  # long enough to cover tracks
+        # Keep the widget as narrow as the line so a move only repaints the
+        # old and new strips of the timeline underneath it.
+        self.setFixedWidth(self.WIDTH)
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
 
     def paintEvent(self, event):
         painter = QPainter(self)
         pen = QPen(Qt.GlobalColor.red)
-        pen.setWidth(2)
+        pen.setWidth(self.WIDTH)
         painter.setPen(pen)
         painter.drawLine(0, 0, 0, self.height())
 
     def move_to(self, x):
+        self.x_pos = x
+        if self.parentWidget() is not None and self.height() < self.parentWidget().height():
+            self.resize(self.WIDTH, self.parentWidget().height())
         self.move(x, 0)
-        self.update()
@@ -1,37 +1,49 @@
 #ui\timeline_view.py
 import os
-import shutil
+from bisect import bisect_left, bisect_right
 
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QFrame, QSizePolicy,
     QScrollArea
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QPoint
+from PyQt6.QtGui import QKeySequence, QShortcut
 from PyQt6.QtWidgets import QPushButton
-from pydub import AudioSegment
-import pygame
-
 
 from core.audio_clip import AudioClip
+from core.history import AddClip, History, SetPlacement
+from core.mixer import MixCache, timeline_mixer
+from core.playback import PlaybackEngine
 from core.track import Track
 from ui.clip_widget import ClipWidget
 from ui.properties_panel import PropertiesPanel
 from ui.playhead import Playhead
-from storage.session_io import load_session_from_file, save_session_to_file
+from storage.session_store import SessionStore, export_session_json
+from storage.journal import EditJournal
+from storage.conform_cache import cached_conformed_source
+from storage.export import write_wav_stream
+from storage.asset_store import AssetStore, open_in_background
+from ui.async_loader import when_done
+from storage.render_manifest import timeline_fingerprint, write_manifest
 
 
 
 PIXELS_PER_SECOND = 100
 INITIAL_DURATION = 60  # seconds
+VIEWPORT_MARGIN = 200  # px of clips kept alive on each side of the viewport
+MIX_CACHE_MAX_BYTES = 64 * 1024 ** 2  # longer sessions are always streamed, never cached whole
 
 class TrackWidget(QFrame):
-    def __init__(self, track_number, backend_track, notify_duration_change, notify_clip_selected, sync_path):
+    def __init__(self, track_number, backend_track, notify_duration_change, notify_clip_selected, sync_path,
+                 notify_clips_changed=None, history=None):
         super().__init__()
         self.sync_path = sync_path
+        self.history = history
         self.track_number = track_number
         self.backend_track = backend_track
         self.notify_duration_change = notify_duration_change
         self.notify_clip_selected = notify_clip_selected
+        self.notify_clips_changed = notify_clips_changed
 
         self.setAcceptDrops(True)
         self.setFrameShape(QFrame.Shape.Box)
@@ -53,7 +65,65 @@ class TrackWidget(QFrame):
         self.track_layout.addWidget(self.clip_area)
         self.setLayout(self.track_layout)
 
-        self.current_x = 0
+        # Only clips near the viewport get a ClipWidget; the rest are just
+        # AudioClips on the backend track.
+        self.clip_widgets = {}  # id(AudioClip) -> ClipWidget
+        self._index = None
+        self._index_revision = None
+
+    def clip_span(self, clip):
+        start = int(clip.start_time * PIXELS_PER_SECOND)
+        return start, start + int(clip.duration * PIXELS_PER_SECOND)
+
+    def end_of_track(self):
+        return max((clip.end_time for clip in self.backend_track.clips), default=0.0)
+
+    def clip_index(self):
+        """
+        (clips sorted by start, their start x, widest clip in px), rebuilt
+        only after the track was edited, not on every scroll.
+        """
+        if self._index_revision != self.backend_track.revision:
+            clips = sorted(self.backend_track.clips, key=lambda clip: clip.start_time)
+            spans = [self.clip_span(clip) for clip in clips]
+            widest = max((end - start for start, end in spans), default=0)
+            self._index = (clips, [start for start, _ in spans], widest)
+            self._index_revision = self.backend_track.revision
+        return self._index
+
+    def update_visible_clips(self, x0, x1, keep=None):
+        """Create widgets for clips overlapping [x0, x1] (clip_area coordinates) and release the rest."""
+        x0, x1 = x0 - VIEWPORT_MARGIN, x1 + VIEWPORT_MARGIN
+        clips, starts, widest = self.clip_index()
+        # Only clips starting in this window can reach the viewport
+        first = bisect_left(starts, x0 - widest)
+        last = bisect_right(starts, x1)
+
+        live = {}
+        for clip in clips[first:last]:
+            start, end = self.clip_span(clip)
+            if end >= x0:
+                widget = self.clip_widgets.pop(id(clip), None)
+                live[id(clip)] = widget or self.create_clip_widget(clip)
+
+        # Widgets scrolled out of view or whose clip is no longer on the track
+        for key, widget in self.clip_widgets.items():
+            if widget is keep and widget.clip.track is self.backend_track:
+                live[key] = widget
+            else:
+                self.release_clip_widget(widget)
+        self.clip_widgets = live
+
+    def create_clip_widget(self, clip):
+        clip_widget = ClipWidget(clip, pixels_per_second=PIXELS_PER_SECOND, parent=self.clip_area,
+                                 history=self.history)
+        clip_widget.mousePressEvent = self.wrap_clip_select(clip_widget)
+        clip_widget.show()
+        return clip_widget
+
+    def release_clip_widget(self, clip_widget):
+        clip_widget.hide()
+        clip_widget.deleteLater()
 
 
     def dragEnterEvent(self, event):
@@ -65,39 +135,37 @@ class TrackWidget(QFrame):
         if urls:
             file_path = urls[0].toLocalFile()
             if file_path.lower().endswith(('.mp3', '.wav')):
-                # Use the correct sync folder path
-                asset_dir = os.path.join(self.sync_path, "assets")
-                os.makedirs(asset_dir, exist_ok=True)
-
-                filename = os.path.basename(file_path)
-                asset_path = os.path.join(asset_dir, filename)
-
-                # Copy if not already in assets/
-                if not os.path.exists(asset_path):
-                    try:
-                        shutil.copy2(file_path, asset_path)
-                    except Exception as e:
-                        self.label.setText(f"Copy failed: {e}")
-                        return
-
-                try:
-                    clip = AudioClip(asset_path)
-                    clip.source_path = asset_path  # make sure AudioClip supports this
-                    self.backend_track.add_clip(clip)
+                # Hash and copy into <sync>/assets, and decode compressed
+                # files to learn their length, off the GUI thread
+                self.label.setText(f"Importing {os.path.basename(file_path)}...")
+                future = open_in_background(AssetStore.for_speaker(self.sync_path), file_path)
+                when_done(future, self.on_asset_imported)
+            else:
+                self.label.setText("Invalid file type")
 
-                    clip_widget = ClipWidget(clip.audio, pixels_per_second=PIXELS_PER_SECOND, parent=self.clip_area)
-                    clip_widget.move(self.current_x, 0)
-                    clip_widget.show()
+    def on_asset_imported(self, future):
+        self.label.setText(f"Track {self.track_number}")
+        try:
+            asset_path, source = future.result()
+        except Exception as e:
+            self.label.setText(f"Copy failed: {e}")
+            return
 
-                    clip_widget.mousePressEvent = self.wrap_clip_select(clip_widget)
+        try:
+            clip = AudioClip(asset_path, start_time=self.end_of_track(), source=source)
+            clip.source_path = asset_path
+            command = AddClip(self.backend_track, clip)
+            if self.history is not None:
+                self.history.execute(command)
+            else:
+                command.do()
 
-                    self.current_x += clip_widget.width()
-                    self.notify_duration_change(clip.duration)
+            self.notify_duration_change(clip.end_time)
+            if self.notify_clips_changed:
+                self.notify_clips_changed()
 
-                except Exception as e:
-                    self.label.setText(f"Failed to load clip: {e}")
-            else:
-                self.label.setText("Invalid file type")
+        except Exception as e:
+            self.label.setText(f"Failed to load clip: {e}")
 
     def wrap_clip_select(self, clip_widget):
         def handler(event):
@@ -111,9 +179,16 @@ class TimelineWidget(QWidget):
     def __init__(self, project_timeline, sync_path=None): 
         super().__init__()
         self.project_timeline = project_timeline
-        self.final_audio = None
         self.duration = INITIAL_DURATION
         self.sync_path = sync_path
+        self.history = History()
+        self.on_compiled = None  # called with sync_path after compiled.wav is written
+        self.session_store = SessionStore(sync_path) if sync_path else None
+        # Edits since the last save are journaled for crash recovery
+        self.journal = None
+        if sync_path:
+            self.journal = EditJournal(sync_path)
+            self.journal.attach(self.project_timeline)
 
         # === Tracks ===
         self.track_widgets = []
@@ -127,7 +202,9 @@ class TimelineWidget(QWidget):
                 track,
                 notify_duration_change=self.extend_if_needed,
                 notify_clip_selected=self.on_clip_selected,
-                sync_path=self.sync_path
+                sync_path=self.sync_path,
+                notify_clips_changed=self.refresh_visible_clips,
+                history=self.history
             )
             self.track_widgets.append(track_widget)
             self.layout.addWidget(track_widget)
@@ -141,6 +218,11 @@ class TimelineWidget(QWidget):
         self.scroll = QScrollArea()
         self.scroll.setWidgetResizable(True)
         self.scroll.setWidget(self.timeline_area)
+        self.scroll.horizontalScrollBar().valueChanged.connect(self.refresh_visible_clips)
+
+        for track in self.project_timeline.tracks:
+            for clip in track.clips:
+                self.extend_if_needed(clip.end_time)
 
         # === Properties Panel ===
         self.properties_panel = PropertiesPanel()
@@ -159,6 +241,18 @@ class TimelineWidget(QWidget):
         self.session_save_button.setFixedWidth(120)
         self.session_save_button.clicked.connect(self.save_session_only)
 
+        # === Undo / Redo ===
+        self.undo_button = QPushButton("Undo")
+        self.undo_button.setFixedWidth(80)
+        self.undo_button.clicked.connect(self.undo)
+        self.redo_button = QPushButton("Redo")
+        self.redo_button.setFixedWidth(80)
+        self.redo_button.clicked.connect(self.redo)
+        for sequence, slot in ((QKeySequence.StandardKey.Undo, self.undo), (QKeySequence.StandardKey.Redo, self.redo)):
+            shortcut = QShortcut(QKeySequence(sequence), self)
+            shortcut.setContext(Qt.ShortcutContext.WidgetWithChildrenShortcut)
+            shortcut.activated.connect(slot)
+
 
         # === Playhead (Red Line) ===
         from ui.playhead import Playhead
@@ -167,6 +261,8 @@ class TimelineWidget(QWidget):
 
         self.timer = None
         self.playing = False
+        self.playback_engine = PlaybackEngine()
+        self.mix_cache = MixCache(self.project_timeline, conform=cached_conformed_source)
 
         # === Layouts ===
 
@@ -174,6 +270,8 @@ class TimelineWidget(QWidget):
         topbar_layout = QHBoxLayout()
         topbar_layout.addWidget(self.play_button)
         topbar_layout.addWidget(self.save_button)
+        topbar_layout.addWidget(self.undo_button)
+        topbar_layout.addWidget(self.redo_button)
         topbar_layout.addStretch()
         topbar_layout.addWidget(self.session_save_button)
 
@@ -192,12 +290,29 @@ class TimelineWidget(QWidget):
 
 
 
-    def extend_if_needed(self, clip_duration):
-        required_duration = int(clip_duration) + 5
+    def extend_if_needed(self, clip_end):
+        required_duration = int(clip_end) + 5
         if required_duration > self.duration:
             self.duration = required_duration
             self.timeline_area.setMinimumWidth(self.duration * PIXELS_PER_SECOND)
 
+    def refresh_visible_clips(self, *_):
+        """Lay out only the clips that overlap the scroll area's viewport."""
+        left = self.scroll.horizontalScrollBar().value()
+        right = left + self.scroll.viewport().width()
+        keep = getattr(self, "selected_clip", None)
+        for track_widget in self.track_widgets:
+            offset = track_widget.clip_area.mapTo(self.timeline_area, QPoint(0, 0)).x()
+            track_widget.update_visible_clips(left - offset, right - offset, keep=keep)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh_visible_clips()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.refresh_visible_clips()
+
     def on_clip_selected(self, clip_widget):
         self.selected_clip = clip_widget
         props = clip_widget.get_properties()
@@ -213,75 +328,108 @@ class TimelineWidget(QWidget):
 
 
     def apply_properties(self):
-        if not hasattr(self, 'selected_clip'):
+        if getattr(self, "selected_clip", None) is None:
             return
 
         inputs = self.properties_panel.get_inputs()
 
-        # Update ClipWidget
-        self.selected_clip.start_time_offset = inputs["start_offset"]
-        self.selected_clip.end_time_offset = inputs["end_offset"]
+        # Update the clip model as one undo step, then the widget viewing it
+        clip = self.selected_clip.clip
+        self.history.execute(SetPlacement(
+            clip,
+            start_time=max(0.0, inputs["position_sec"]),
+            trim_start=inputs["start_offset"],
+            trim_end=clip.source.duration - inputs["end_offset"],
+        ))
 
-        self.selected_clip.move(int(inputs["position_sec"] * PIXELS_PER_SECOND), self.selected_clip.y())
         self.selected_clip.update_audio_clip()
+        self.extend_if_needed(self.selected_clip.clip.end_time)
+        self.refresh_visible_clips()
 
         # Refresh property panel to reflect true values after update
         props = self.selected_clip.get_properties()
         self.properties_panel.update_fields(props)
 
+    def undo(self):
+        if self.history.undo():
+            self.after_history_change()
+
+    def redo(self):
+        if self.history.redo():
+            self.after_history_change()
+
+    def after_history_change(self):
+        # The selected clip may have been taken off its track (undoing its
+        # add); drop the selection so its widget is released with the rest
+        selected = getattr(self, "selected_clip", None)
+        if selected is not None and selected.clip.track is None:
+            self.selected_clip = None
+            self.properties_panel.hide()
+            for track_widget in self.track_widgets:
+                if track_widget.clip_widgets.get(id(selected.clip)) is selected:
+                    break
+            else:
+                # Already out of every track's widgets, kept alive only as the selection
+                selected.hide()
+                selected.deleteLater()
+
+        # Widgets only view the model, so re-read it everywhere
+        for track_widget in self.track_widgets:
+            for clip_widget in track_widget.clip_widgets.values():
+                clip_widget.update_audio_clip()
+            self.extend_if_needed(track_widget.end_of_track())
+        self.refresh_visible_clips()
+        if getattr(self, "selected_clip", None) is not None:
+            self.properties_panel.update_fields(self.selected_clip.get_properties())
+
     def start_playback(self):
         if self.playing:
             return
 
         from PyQt6.QtCore import QTimer
-        import os
 
         self.playing = True
 
-        self.mix_project_audio()
-        if self.final_audio is None or len(self.final_audio) == 0:
+        # Blocks are mixed on demand by the engine, so playback starts
+        # without mixing the whole project or writing a temp file first.
+        mixer = self.build_mixer()
+        if mixer is None or mixer.frame_count == 0:
             self.stop_playback()
             print("[ERROR] No audio to play.")
             return
 
-        # Ensure mixer is reset to avoid file locks
-        if pygame.mixer.get_init():
-            pygame.mixer.music.stop()
-            pygame.mixer.quit()
-
-        # Make sure temp folder exists
-        if not os.path.exists("temp"):
-            os.makedirs("temp")
+        frame_rate, _ = mixer.output_format()
+        start_frame = int(self.playhead.x_pos / PIXELS_PER_SECOND * frame_rate)
+        if start_frame >= mixer.frame_count:
+            start_frame = 0
+        self.playback_engine.start(mixer, start_frame)
 
-        # Save compiled mix to file
-        self.final_audio.export("temp/compiled_mixdown.wav", format="wav")
-
-        # Start playback
-        pygame.mixer.init()
-        pygame.mixer.music.load("temp/compiled_mixdown.wav")
-        pygame.mixer.music.play()
-
-        self.playhead.x_pos = 0
-        self.playhead.move_to(0)
+        self.playhead.move_to(int(start_frame / frame_rate * PIXELS_PER_SECOND))
 
+        # Poll the engine's sample clock once per display frame
+        screen = self.screen()
+        refresh_rate = screen.refreshRate() if screen and screen.refreshRate() > 0 else 60.0
         self.timer = QTimer()
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
         self.timer.timeout.connect(self.move_playhead)
-        self.timer.start(50)
+        self.timer.start(max(1, int(1000 / refresh_rate)))
 
 
     def move_playhead(self):
-        step = PIXELS_PER_SECOND / 20  # 50ms -> 1s/20
-        self.playhead.x_pos += int(step)
-        self.playhead.move_to(self.playhead.x_pos)
+        # Position comes from the frames the sink has played, so a stalled
+        # event loop only delays the redraw instead of making the line drift.
+        x = int(self.playback_engine.position_seconds * PIXELS_PER_SECOND)
+        if x != self.playhead.x_pos:
+            self.playhead.move_to(x)
 
-        if self.playhead.x_pos > self.timeline_area.width():
+        if x > self.timeline_area.width() or not self.playback_engine.playing:
             self.stop_playback()
+            self.play_button.setText("Play")
 
     def stop_playback(self):
         if self.timer:
             self.timer.stop()
-        if pygame.mixer.get_init():
-            pygame.mixer.music.stop()
+        self.playback_engine.stop()
         self.playing = False
 
 
@@ -293,52 +441,37 @@ class TimelineWidget(QWidget):
             self.stop_playback()
             self.play_button.setText("Play")
 
-    def mix_project_audio(self):
-        """
-        Create final compiled timeline from all clips.
-        """
-
-        print("Mixing project audio...")
-        # Determine total length
-        total_duration_ms = 0
-
-        track_segments = []
-
-        for track_widget in self.track_widgets:
-            track_audio = AudioSegment.silent(duration=self.duration * 1000)
-
-            # Walk each clip in the track
-            for clip_widget in track_widget.clip_area.children():
-                if isinstance(clip_widget, ClipWidget):
-                    clip_audio = clip_widget.audio_clip
-
-                    clip_start_sec = clip_widget.x() / PIXELS_PER_SECOND
-                    clip_start_ms = int(clip_start_sec * 1000)
-
-                    # Place clip at correct location
-                    track_audio = track_audio.overlay(clip_audio, position=clip_start_ms)
-
-                    total_duration_ms = max(total_duration_ms, clip_start_ms + len(clip_audio))
-
-            track_segments.append(track_audio)
-
-        if not track_segments:
-            self.final_audio = None
-            return
-
-        # Mix tracks together
-        final_mix = track_segments[0]
-        for segment in track_segments[1:]:
-            final_mix = final_mix.overlay(segment)
-
-        # Trim to actual content length
-        self.final_audio = final_mix[:total_duration_ms]
-        print(f"Final compiled length: {total_duration_ms/1000:.2f} seconds")
+    def build_mixer(self):
+        if not self.track_widgets:
+            return None
+
+        # Once a full mix exists, bring it up to date (only the edited
+        # ranges are re-rendered) and play from it; otherwise stream.
+        mixer = timeline_mixer(self.project_timeline, conform=cached_conformed_source)
+        if not self.fits_mix_cache(mixer):
+            self.mix_cache.bus = None  # the session outgrew the cache
+        elif self.mix_cache.bus is not None:
+            self.mix_cache.update()
+            return self.mix_cache
+        return mixer
+
+    @staticmethod
+    def fits_mix_cache(mixer):
+        _, channels = mixer.output_format()
+        return mixer.frame_count * channels * 4 <= MIX_CACHE_MAX_BYTES
 
     def save_mixdown(self):
-        self.mix_project_audio()
+        if not self.track_widgets:
+            print("[ERROR] No audio to export.")
+            return
 
-        if self.final_audio is None or len(self.final_audio) == 0:
+        # Streams from the clips; only sessions small enough to keep under
+        # MIX_CACHE_MAX_BYTES are mixed whole, for later incremental re-mixes
+        mixer = self.build_mixer()
+        if mixer is not self.mix_cache and self.fits_mix_cache(mixer):
+            self.mix_cache.update()
+            mixer = self.mix_cache
+        if mixer.frame_count == 0:
             print("[ERROR] No audio to export.")
             return
 
@@ -348,31 +481,36 @@ class TimelineWidget(QWidget):
 
         try:
             save_path = os.path.join(self.sync_path, "compiled.wav")
-            self.final_audio.export(save_path, format="wav")
+            frame_rate, _ = mixer.output_format()
+            frames = write_wav_stream(mixer, save_path)
+            write_manifest(self.sync_path, timeline_fingerprint(self.project_timeline),
+                           frames / float(frame_rate))
             print(f"Auto-saved to {save_path}")
+            if self.on_compiled:
+                self.on_compiled(self.sync_path)
 
-            from storage.session_io import save_session_to_file
-            save_session_to_file(self.project_timeline, self.sync_path)
-            print(f"Session saved to {os.path.join(self.sync_path, 'session.json')}")
+            self.save_session()
+            print(f"Session saved to {self.session_store.path}")
 
         except Exception as e:
             print(f"[ERROR] Failed to save mixdown or session: {e}")
 
-            save_path = os.path.join(self.sync_path, "compiled.wav")
-            try:
-                self.final_audio.export(save_path, format="wav")
-                print(f"Auto-saved to {save_path}")
-            except Exception as e:
-                print(f"[ERROR] Failed to save mixdown: {e}")
-
 
     def save_session_only(self):
         if not hasattr(self, "sync_path"):
             print("No sync_path set — cannot save session.")
             return
         try:
-            from storage.session_io import save_session_to_file
-            save_session_to_file(self.project_timeline, self.sync_path)
+            # Explicit saves also refresh session.json for other tools
+            self.save_session(export_json=True)
             print(f"Session saved to {os.path.join(self.sync_path, 'session.json')}")
         except Exception as e:
             print(f"[ERROR] Failed to save session: {e}")
+
+    def save_session(self, export_json=False):
+        if export_json:
+            export_session_json(self.project_timeline, self.sync_path, self.session_store)
+        else:
+            self.session_store.save(self.project_timeline)
+        if self.journal:
+            self.journal.checkpoint()